@@ -0,0 +1,80 @@
+"""Compare `update_from` and `fillna_from` against the merge based
+implementation they replaced.
+
+    python -m benchmarks.bench_update --rows 1000000 --columns 20
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from kirei import Table
+
+
+def make_frames(rows, columns, seed=0):
+    rng = np.random.RandomState(seed)
+    keys = rng.permutation(rows)
+    left = {'key': keys}
+    right = {'key': np.arange(rows)}
+    for ii in range(columns):
+        name = 'c{}'.format(ii)
+        if ii % 2:
+            left[name] = pd.Series(rng.randint(0, 1000, rows).astype(str)).where(rng.rand(rows) > 0.2)
+            right[name] = pd.Series(rng.randint(0, 1000, rows).astype(str)).where(rng.rand(rows) > 0.2)
+        else:
+            left[name] = np.where(rng.rand(rows) > 0.2, rng.rand(rows), np.nan)
+            right[name] = np.where(rng.rand(rows) > 0.2, rng.rand(rows), np.nan)
+    left['count'] = right['count'] = rng.randint(0, 100, rows)
+    left['flag'] = right['flag'] = rng.rand(rows) > 0.5
+
+    # Leave some left keys without a match.
+    right = pd.DataFrame(right)
+    return pd.DataFrame(left), right[rng.rand(rows) > 0.1].reset_index(drop=True)
+
+
+def merge_update(da, db, key, columns):
+    values = da[key].merge(db[columns + key], on=key, how='left')
+    values.index = da.index
+    da.update(values[columns])
+
+
+def merge_fillna(da, db, key, columns):
+    values = da[key].merge(db[columns + key], on=key, how='left')
+    values.index = da.index
+    da.fillna(values[columns], inplace=True)
+
+
+def make_table(df):
+    table = Table(load=False)
+    table.data = df.copy()
+    return table
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--columns', type=int, default=20)
+    args = parser.parse_args(argv)
+    left, right = make_frames(args.rows, args.columns)
+    columns = [c for c in right.columns if c != 'key']
+    other = make_table(right)
+
+    for op, reference in (('update', merge_update), ('fillna', merge_fillna)):
+        da = left.copy()
+        merged = timed(reference, da, right, ['key'], columns)
+        table = make_table(left)
+        gathered = timed(getattr(table, op + '_from'), other, 'key', columns)
+        pd.testing.assert_frame_equal(table.data, da)
+        print('{}: merge {:.3f}s, gather {:.3f}s ({:.1f}x)'.format(
+            op, merged, gathered, merged / gathered
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Synthetic data for benchmarking tables.
+
+Frames have a unique integer `id`, a `group` key with a chosen number of
+distinct values, then alternating string and float columns with a
+fraction of missing values.
+"""
+import numpy as np
+import pandas as pd
+
+from kirei.formats import write_frame
+
+
+def make_frame(rows, width=8, cardinality=1000, null_rate=0.1, seed=0):
+    """Make a frame of `rows` rows with `width` value columns.
+    """
+    rng = np.random.RandomState(seed)
+    data = {
+        'id': rng.permutation(rows),
+        'group': make_keys(rng.randint(0, cardinality, rows)),
+    }
+    for ii in range(width):
+        nulls = rng.rand(rows) < null_rate
+        if ii % 2:
+            values = np.where(nulls, np.nan, rng.rand(rows) * 1000)
+            data['f{}'.format(ii)] = values
+        else:
+            words = make_words(rng, max(min(cardinality, rows, 10000), 1))
+            values = pd.Series(words[rng.randint(0, len(words), rows)], dtype=object)
+            data['s{}'.format(ii)] = values.where(~nulls)
+    return pd.DataFrame(data)
+
+
+def make_lookup(cardinality=1000, columns=('lookup',), seed=1):
+    """Make a frame with one row per `group` key, for joining.
+    """
+    rng = np.random.RandomState(seed)
+    data = {'group': make_keys(np.arange(cardinality))}
+    for name in columns:
+        data[name] = rng.rand(cardinality)
+    return pd.DataFrame(data)
+
+
+def make_keys(values):
+    keys = np.array(['G{:07d}'.format(v) for v in range(values.max() + 1 if len(values) else 0)],
+                    dtype=object)
+    return keys[values]
+
+
+def make_words(rng, count):
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    return np.array([
+        '  {} '.format(''.join(rng.choice(letters, 6))) if ii % 5 == 0 else ''.join(rng.choice(letters, 6))
+        for ii in range(count)
+    ], dtype=object)
+
+
+def write_source(df, path, format=None):
+    """Write `df` to `path`, returning the path.
+    """
+    write_frame(df, path, format)
+    return path
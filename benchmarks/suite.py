@@ -0,0 +1,341 @@
+"""Benchmarks for each stage of `Table.process` and for `registry.run`.
+
+    python -m benchmarks.suite --rows 1000000 --output results.json
+    python -m benchmarks.suite --rows 1000000 --compare results.json
+
+Each benchmark prepares fresh tables, runs any earlier stages untimed,
+then times only its own stage. Results are written as JSON; comparing
+against an earlier run reports benchmarks slower by more than the
+threshold and exits non-zero.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from kirei import Table, registry
+
+from .generators import make_frame, make_lookup, write_source
+
+
+STAGES = [
+    'load', 'clean_all_fields', 'filter', 'check_unique', 'join_all_tables',
+    'do_validate', 'save',
+]
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(func):
+    """Register a benchmark.
+
+    The function takes the `Env` and returns the callable to time, after
+    doing any setup.
+    """
+    BENCHMARKS[func.__name__[6:]] = func
+    return func
+
+
+class Env(object):
+    """Generated sources and parameters shared by the benchmarks.
+    """
+    def __init__(self, rows, width=8, cardinality=1000, format='csv', model_rows=10000):
+        self.rows = rows
+        self.width = width
+        self.cardinality = cardinality
+        self.format = format
+        self.model_rows = model_rows
+        self.dir = tempfile.mkdtemp()
+        self.source = 'source.' + format
+        self.lookup = 'lookup.' + format
+        self.frame = make_frame(rows, width, cardinality)
+        write_source(self.frame, os.path.join(self.dir, self.source))
+        write_source(
+            make_lookup(cardinality, ['lookup0', 'lookup1']),
+            os.path.join(self.dir, self.lookup)
+        )
+        self.numeric = [c for c in self.frame.columns if c.startswith('f')]
+        self.strings = [c for c in self.frame.columns if c.startswith('s')]
+
+    def close(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def get_classes(self):
+        """Make the table classes, with sources relative to `dir`.
+        """
+        env = self
+
+        class Lookup(Table):
+            name = 'Lookup'
+            source = env.lookup
+
+        class Source(Table):
+            name = 'Source'
+            source = env.source
+            fields = OrderedDict([(c, {}) for c in env.frame.columns])
+            joins = {'Lookup': {'on': 'group', 'how': 'left'}}
+            unique = ['id']
+            output = {'output.' + env.format: {}}
+
+            def filter(self):
+                self.drop_empty(env.strings[0])
+
+            def validate(self, df):
+                assert df['id'].notnull().all()
+
+        return Source, Lookup
+
+    def get_tables(self):
+        """Make registered, processed lookup and unprocessed source tables.
+        """
+        out = os.path.join(self.dir, 'out')
+        if not os.path.exists(out):
+            os.mkdir(out)
+        tables = []
+        for cls in self.get_classes():
+            table = cls(self.dir, out_root=out, load=False)
+            registry._all_tables[table.name] = table
+            tables.append(table)
+        for table in tables:
+            table.resolve_source()
+        source, lookup = tables
+        lookup.load()
+        return source, lookup
+
+    def run_stages(self, table, until):
+        for stage in STAGES[:STAGES.index(until)]:
+            getattr(table, stage)()
+
+
+def stage_benchmark(stage):
+    def bench(env):
+        source, _ = env.get_tables()
+        env.run_stages(source, stage)
+        return getattr(source, stage)
+    bench.__name__ = 'bench_' + stage
+    return benchmark(bench)
+
+
+for _stage in STAGES:
+    stage_benchmark(_stage)
+
+
+@benchmark
+def bench_process(env):
+    source, _ = env.get_tables()
+    return source.process
+
+
+@benchmark
+def bench_condense(env):
+    source, lookup = env.get_tables()
+    env.run_stages(source, 'join_all_tables')
+
+    # Stop condense processing the rest of the source while timed.
+    source._run_once_process = True
+    return lambda: lookup.condense(source, 'group', env.strings[0])
+
+
+@benchmark
+def bench_autofill(env):
+    source, _ = env.get_tables()
+    env.run_stages(source, 'join_all_tables')
+    return lambda: type(source).autofill('group', env.strings[1:] or env.strings)
+
+
+@benchmark
+def bench_update_from(env):
+    source, lookup = env.get_tables()
+    env.run_stages(source, 'join_all_tables')
+    lookup.data = source.data.drop_duplicates('group')[['group'] + env.numeric]
+    return lambda: source.update_from(lookup, 'group', env.numeric)
+
+
+@benchmark
+def bench_fillna_from(env):
+    source, lookup = env.get_tables()
+    env.run_stages(source, 'join_all_tables')
+    lookup.data = source.data.drop_duplicates('group')[['group'] + env.numeric]
+    return lambda: source.fillna_from(lookup, 'group', env.numeric)
+
+
+@benchmark
+def bench_save_model(env):
+    try:
+        model = get_model()
+    except ImportError:
+        return None
+    from kirei.model import save_model
+    source, _ = env.get_tables()
+    df = env.frame[['id', 'group']].head(env.model_rows)
+    df = pd.DataFrame({'code': df['id'].astype(str), 'group': df['group']})
+    model.objects.all().delete()
+    return lambda: save_model(source, df, model, {'unique': 'code', 'bulk': True})
+
+
+@benchmark
+def bench_registry_run(env):
+    classes = env.get_classes()
+    for cls in classes:
+        registry._all_tables.pop(cls.__name__, None)
+        registry._all_table_cls[cls.__name__] = cls
+    out = tempfile.mkdtemp(dir=env.dir)
+    return lambda: registry.run(env.dir, out_root=out)
+
+
+_model = []
+
+
+def get_model():
+    """Make a Django model in an in-memory SQLite database.
+    """
+    if _model:
+        return _model[0]
+    import django
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(
+            DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+            INSTALLED_APPS=[],
+        )
+        django.setup()
+    from django.db import connection, models
+
+    class BenchRow(models.Model):
+        code = models.CharField(max_length=32, unique=True)
+        group = models.CharField(max_length=32)
+
+        class Meta:
+            app_label = 'benchmarks'
+
+    with connection.schema_editor() as editor:
+        editor.create_model(BenchRow)
+    _model.append(BenchRow)
+    return BenchRow
+
+
+def reset_registry(state):
+    registry._all_tables.clear()
+    registry._all_tables.update(state[0])
+    registry._all_table_cls.clear()
+    registry._all_table_cls.update(state[1])
+
+
+def time_benchmark(env, func, repeat=3):
+    """Time a benchmark, returning the wall times of each repeat.
+    """
+    state = (OrderedDict(registry._all_tables), OrderedDict(registry._all_table_cls))
+    times = []
+    try:
+        for ii in range(repeat):
+            call = func(env)
+            if call is None:
+                return None
+            start = time.perf_counter()
+            call()
+            times.append(time.perf_counter() - start)
+            reset_registry(state)
+    finally:
+        reset_registry(state)
+    return times
+
+
+def run(env, repeat=3, pattern=None):
+    """Run the benchmarks with names matching `pattern`.
+    """
+    results = OrderedDict()
+    for name, func in BENCHMARKS.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        times = time_benchmark(env, func, repeat)
+        if times is None:
+            continue
+        results[name] = OrderedDict([
+            ('min', min(times)),
+            ('median', statistics.median(times)),
+            ('rows_per_sec', env.rows / min(times) if min(times) else None),
+            ('times', times),
+        ])
+    return results
+
+
+def get_meta(env, repeat):
+    return OrderedDict([
+        ('timestamp', time.strftime('%Y-%m-%dT%H:%M:%S')),
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('pandas', pd.__version__),
+        ('numpy', np.__version__),
+        ('params', OrderedDict([
+            ('rows', env.rows),
+            ('width', env.width),
+            ('cardinality', env.cardinality),
+            ('format', env.format),
+            ('model_rows', env.model_rows),
+            ('repeat', repeat),
+        ])),
+    ])
+
+
+def compare(old, new, threshold=1.25):
+    """Find benchmarks in `new` slower than in `old` by more than
+    `threshold` times, using the best time of each.
+    """
+    slower = OrderedDict()
+    for name, result in new['results'].items():
+        prev = old['results'].get(name)
+        if prev and prev['min'] and result['min'] / prev['min'] > threshold:
+            slower[name] = result['min'] / prev['min']
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--width', type=int, default=8)
+    parser.add_argument('--cardinality', type=int, default=1000)
+    parser.add_argument('--format', default='csv')
+    parser.add_argument('--model-rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', help='only run benchmarks matching this regex')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='compare with results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args(argv)
+    logging.getLogger('kirei').setLevel(logging.ERROR)
+
+    env = Env(args.rows, args.width, args.cardinality, args.format, args.model_rows)
+    try:
+        data = OrderedDict([
+            ('meta', get_meta(env, args.repeat)),
+            ('results', run(env, args.repeat, args.filter)),
+        ])
+    finally:
+        env.close()
+    for name, result in data['results'].items():
+        print('{:<20} {:>10.4f}s {:>10.4f}s'.format(name, result['min'], result['median']))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(data, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            slower = compare(json.load(file), data, args.threshold)
+        for name, ratio in slower.items():
+            print('{} is {:.2f}x slower'.format(name, ratio))
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,7 @@ import inspect
 
 from .table import Table
 from .config import set_config, get_config
+from .stats import Stats
 from .registry import (
     run, iter_tables, register_tables
 )
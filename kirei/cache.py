@@ -0,0 +1,170 @@
+import os
+import six
+import hashlib
+import inspect
+import logging
+import threading
+
+import pandas as pd
+
+from .config import get_config
+
+
+logger = logging.getLogger('kirei.cache')
+
+FORMATS = {
+    'pickle': ('.pkl', lambda df, path: df.to_pickle(path), pd.read_pickle),
+    'parquet': ('.parquet', lambda df, path: df.to_parquet(path), pd.read_parquet),
+    'feather': ('.feather', lambda df, path: df.reset_index(drop=True).to_feather(path), pd.read_feather),
+}
+
+
+def get_cache_dir():
+    return get_config('cache_dir', None)
+
+
+def hash_file(path, block_size=1 << 20):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def fingerprint(table):
+    """Calculate a fingerprint of everything that affects a processed table.
+
+    Covers the source file (size, mtime and optionally a content hash),
+    the `fields`, `joins` and `unique` specs, the class source and the
+    fingerprints of all dependencies. Returns None if the table can't be
+    cached. The fingerprint is calculated once per table instance, before
+    loading can alter the specs.
+    """
+    if '_fingerprint' in table.__dict__:
+        return table._fingerprint
+    table._fingerprint = _fingerprint(table)
+    return table._fingerprint
+
+
+def _fingerprint(table):
+    if not getattr(table, 'cacheable', True) or getattr(table, 'chunksize', None):
+        return None
+
+    # Incremental tables only hold the latest delta.
+    if getattr(table, 'incremental', False):
+        return None
+    sha = hashlib.sha1()
+    path, tbl = table.get_source()
+    if tbl is None:
+        if not isinstance(path, six.string_types) or not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        sha.update(repr((os.path.abspath(path), stat.st_size, stat.st_mtime)).encode('utf8'))
+        if get_config('cache_hash', False):
+            sha.update(hash_file(path).encode('utf8'))
+    for attr in ('fields', 'joins', 'unique', 'depends'):
+        sha.update(repr(sorted_repr(getattr(table, attr, None))).encode('utf8'))
+    for cls in type(table).__mro__:
+        if cls is object or cls.__module__.split('.')[0] == 'kirei':
+            continue
+        try:
+            sha.update(inspect.getsource(cls).encode('utf8'))
+        except (OSError, TypeError):
+            sha.update(cls.__qualname__.encode('utf8'))
+    for dep in table.iter_dependencies():
+        dep_fp = fingerprint(dep)
+        if dep_fp is None:
+            return None
+        sha.update(dep_fp.encode('utf8'))
+    return sha.hexdigest()
+
+
+def sorted_repr(value):
+    if isinstance(value, dict):
+        return [(repr(k), sorted_repr(v)) for k, v in sorted(value.items(), key=lambda x: repr(x[0]))]
+    elif isinstance(value, (list, tuple)):
+        return [sorted_repr(v) for v in value]
+    elif callable(value):
+        return '{}.{}'.format(getattr(value, '__module__', ''), getattr(value, '__qualname__', value))
+    return repr(value)
+
+
+def get_cache_path(table):
+    base = get_cache_dir()
+    if base is None:
+        return None
+    fp = fingerprint(table)
+    if fp is None:
+        return None
+    ext = FORMATS[get_config('cache_format', 'pickle')][0]
+    return os.path.join(base, '{}-{}{}'.format(table.name, fp, ext))
+
+
+def load_cached(table):
+    """Return the cached processed data for a table, or None.
+    """
+    path = get_cache_path(table)
+    if path is None or not os.path.exists(path):
+        return None
+    logger.info('Loading {} from cache {}'.format(table.name, path))
+    try:
+        os.utime(path, None)
+        return FORMATS[get_config('cache_format', 'pickle')][2](path)
+    except FileNotFoundError:
+        # Evicted by another thread.
+        return None
+
+
+def store_cached(table):
+    path = get_cache_path(table)
+    if path is None:
+        return
+    base = os.path.dirname(path)
+    if not os.path.exists(base):
+        os.makedirs(base, exist_ok=True)
+
+    # Remove stale entries for this table.
+    prefix = table.name + '-'
+    for name in os.listdir(base):
+        if name.startswith(prefix) and os.path.join(base, name) != path:
+            _remove(os.path.join(base, name))
+
+    # Write then rename, so other threads never read a partial entry.
+    logger.info('Caching {} to {}'.format(table.name, path))
+    tmp_path = '{}.{}.tmp'.format(path, threading.get_ident())
+    FORMATS[get_config('cache_format', 'pickle')][1](table.data, tmp_path)
+    os.replace(tmp_path, path)
+    evict(base, get_config('cache_size', None))
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def evict(base, max_size):
+    """Remove least recently used entries until the cache fits `max_size` bytes.
+    """
+    if max_size is None:
+        return
+    entries = []
+    for name in os.listdir(base):
+        if name.endswith('.tmp'):
+            continue
+        path = os.path.join(base, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # Removed by another thread.
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort()
+    total = sum([e[1] for e in entries])
+    for mtime, size, path in entries:
+        if total <= max_size:
+            break
+        logger.info('Evicting {} from cache'.format(path))
+        _remove(path)
+        total -= size
@@ -0,0 +1,52 @@
+import logging
+
+import pandas as pd
+
+
+logger = logging.getLogger('kirei.dtypes')
+
+
+def plan_categories(sample, max_unique_ratio=0.5, exclude=()):
+    """Suggest `category` for low-cardinality string columns of a sample.
+    """
+    plan = {}
+    for name, col in sample.items():
+        if name in exclude:
+            continue
+        if not (col.dtype == object or pd.api.types.is_string_dtype(col.dtype)):
+            continue
+        values = col.dropna()
+        if len(values) and values.nunique() <= max_unique_ratio * len(values):
+            plan[name] = 'category'
+    return plan
+
+
+def downcast(df, floats=False, exclude=(), unsigned=False, integers=False):
+    """Downcast numeric columns to the smallest type holding their values.
+
+    Integers are only downcast when `integers` is set, as arithmetic like
+    `df.n * 1000` silently overflows a small type. Non-negative integers
+    are only made unsigned when `unsigned` is also set, as `df.n - 1`
+    would wrap around. Floats are only downcast when `floats` is set, as
+    float32 loses precision.
+    """
+    for name in df.columns:
+        if name in exclude:
+            continue
+        col = df[name]
+        if pd.api.types.is_bool_dtype(col.dtype):
+            continue
+        if integers and pd.api.types.is_integer_dtype(col.dtype):
+            kind = 'unsigned' if unsigned and len(col) and col.min() >= 0 else 'integer'
+            df[name] = pd.to_numeric(col, downcast=kind)
+        elif floats and pd.api.types.is_float_dtype(col.dtype):
+            df[name] = pd.to_numeric(col, downcast='float')
+    return df
+
+
+def memory_report(before, after):
+    """Per-column memory, before and after planning, sorted by saving.
+    """
+    report = pd.DataFrame({'before': before, 'after': after})
+    report['saved'] = report['before'] - report['after']
+    return report.sort_values('saved', ascending=False)
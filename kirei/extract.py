@@ -1,23 +1,28 @@
 # Use "tsql -H <host> -L" to get list of ports.
 #
 
-import pymssql
+import os
+import sys
+import csv
+import json
 import argparse
+import logging
+import binascii
+import threading
+from datetime import datetime, date
+from decimal import Decimal
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
 
-parser = argparse.ArgumentParser()
-parser.add_argument('--in-host')
-parser.add_argument('--in-port')
-parser.add_argument('--in-user')
-parser.add_argument('--in-pass')
-parser.add_argument('--in-dbname')
-args = parser.parse_args()
 
+logger = logging.getLogger('kirei.extract')
 
-in_conn = pymssql.connect(
-    args.in_host, args.in_user, args.in_pass, args.in_dbname,
-    port=args.in_port
-)
+SKIP_TYPES = set(['varbinary', 'uniqueidentifier', 'nvarchar', 'image'])
 
 
 def get_columns(conn, table):
@@ -106,18 +111,422 @@ def create_table(conn, table, columns):
     cursor.execute(sql)
 
 
-def copy_data_csv(in_conn, table, columns):
-    with open('{}.csv'.format(table.lower()), 'w') as out_file:
-        in_cur = in_conn.cursor()
-        in_cur.execute('SELECT * FROM {}'.format(table))
-        out_file.write(','.join(['"{}"'.format(c[0].lower()) for c in columns]) + '\n')
-        for row in in_cur.fetchall():
-            out_file.write(','.join(['"{}"'.format(encode_csv(c[1], str(v)) if v not in ['', None] else '') for v, c in zip(row, columns)]) + '\n')
+class ConnectionPool(object):
+    """A simple pool of DB-API connections created on demand.
+    """
 
+    def __init__(self, connect):
+        self.connect = connect
+        self._idle = Queue()
+        self._all = []
 
-in_cursor = in_conn.cursor()
-in_cursor.execute('SELECT TABLE_NAME FROM {}.INFORMATION_SCHEMA.Tables'.format(args.in_dbname))
-for row in in_cursor.fetchall():
-    print(row)
-    columns = get_columns(in_conn, row[0])
-    copy_data_csv(in_conn, row[0], columns)
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except Empty:
+            conn = self.connect()
+            self._all.append(conn)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        for conn in self._all:
+            conn.close()
+        self._all = []
+
+
+def list_tables(conn, dbname):
+    cursor = conn.cursor()
+    cursor.execute('SELECT TABLE_NAME FROM {}.INFORMATION_SCHEMA.Tables'.format(dbname))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def iter_batches(cursor, batch_size):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield rows
+
+
+def encode_row(row, types, skip_types=SKIP_TYPES):
+    return [
+        '' if v is None or v == '' or (t is not None and t.lower() in skip_types) else v
+        for v, t in zip(row, types)
+    ]
+
+
+def write_csv(path, names, batches, types, skip_types=SKIP_TYPES):
+    count = 0
+    with open(path, 'w', newline='') as out_file:
+        writer = csv.writer(out_file, quoting=csv.QUOTE_ALL)
+        writer.writerow(names)
+        for rows in batches:
+            writer.writerows([encode_row(r, types, skip_types) for r in rows])
+            count += len(rows)
+    return count
+
+
+ARROW_TYPES = {
+    'bit': 'bool_',
+    'tinyint': 'uint8',
+    'smallint': 'int16',
+    'int': 'int32',
+    'bigint': 'int64',
+    'real': 'float32',
+    'float': 'float64',
+    'date': 'date32',
+    'char': 'string',
+    'varchar': 'string',
+    'nchar': 'string',
+    'nvarchar': 'string',
+    'text': 'string',
+    'ntext': 'string',
+    'uniqueidentifier': 'string',
+}
+
+# Precision and scale of the money types.
+MONEY_TYPES = {
+    'money': (19, 4),
+    'smallmoney': (10, 4),
+}
+
+
+def get_arrow_type(column, skip_types=SKIP_TYPES):
+    """Map a column as returned by `get_columns` to an Arrow type, or None
+    if its type is unknown.
+    """
+    import pyarrow as pa
+    type = column[1].lower() if column[1] is not None else None
+    if type is None:
+        return None
+    if type in skip_types:
+        return pa.string()
+    if type in ('decimal', 'numeric') and len(column) > 4:
+        return pa.decimal128(column[3], column[4])
+    if type in MONEY_TYPES:
+        return pa.decimal128(*MONEY_TYPES[type])
+    if type in ('datetime', 'datetime2', 'smalldatetime'):
+        return pa.timestamp('us')
+    if type in ARROW_TYPES:
+        return getattr(pa, ARROW_TYPES[type])()
+    return None
+
+
+def write_parquet(path, names, batches, types, skip_types=SKIP_TYPES, max_pending=10,
+                  arrow_types=None):
+    """Write batches to Parquet.
+
+    `arrow_types` gives the Arrow type of each column, or None where it
+    is unknown. Unknown types are inferred from the first batches, which
+    are held back while any such column has only nulls, up to
+    `max_pending` of them; columns still all null after that are written
+    as strings. Inferred decimals are widened to the largest precision.
+    """
+    import pandas as pd
+    import pyarrow.parquet as pq
+    known = dict([
+        (n, t) for n, t in zip(names, arrow_types or []) if t is not None
+    ])
+    count = 0
+    writer = None
+    pending = []
+    stringify = []
+    try:
+        for rows in batches:
+            rows = [[None if v == '' else v for v in r] for r in
+                    (encode_row(r, types, skip_types) for r in rows)]
+            df = pd.DataFrame(rows, columns=names, dtype=object)
+            count += len(rows)
+            if writer is None:
+                pending.append(df)
+                df = pd.concat(pending, ignore_index=True)
+                nulls = [c for c in names if c not in known and df[c].isnull().all()]
+                if nulls and len(pending) < max_pending:
+                    continue
+                schema, stringify = _make_schema(df, known)
+                writer = pq.ParquetWriter(path, schema)
+                pending = []
+            _write_batch(writer, df, stringify)
+        if pending:
+            df = pd.concat(pending, ignore_index=True)
+            schema, stringify = _make_schema(df, known)
+            writer = pq.ParquetWriter(path, schema)
+            _write_batch(writer, df, stringify)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def _make_schema(df, known):
+    """Build a schema from the known column types, inferring the rest.
+
+    Returns the schema and the inferred columns that must be written as
+    strings.
+    """
+    import pyarrow as pa
+    schema = pa.Table.from_pandas(df, preserve_index=False).schema
+    stringify = []
+    for ii, field in enumerate(schema):
+        if field.name in known:
+            type = known[field.name]
+        elif pa.types.is_null(field.type):
+            type = pa.string()
+            stringify.append(field.name)
+        elif pa.types.is_decimal(field.type):
+            type = pa.decimal128(38, field.type.scale)
+        else:
+            continue
+        schema = schema.set(ii, pa.field(field.name, type))
+    return schema, stringify
+
+
+def _write_batch(writer, df, stringify):
+    import pyarrow as pa
+    for name in stringify:
+        df[name] = df[name].map(lambda v: None if v is None else str(v))
+    writer.write_table(pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False))
+
+
+WRITERS = {
+    'csv': ('.csv', write_csv),
+    'parquet': ('.parquet', write_parquet),
+}
+
+
+def copy_table(conn, table, out_dir='.', columns=None, batch_size=10000, format='csv',
+               skip_types=SKIP_TYPES):
+    """Stream a table to a file `batch_size` rows at a time.
+
+    `columns` is a list of (name, type, ...) rows as returned by
+    `get_columns`; if not given the names are taken from the cursor and
+    no type-based encoding is applied. Parquet column types are taken
+    from them where known.
+    """
+    ext, write = WRITERS[format]
+    path = os.path.join(out_dir, table.lower() + ext)
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM {}'.format(table))
+    if columns is None:
+        columns = [(d[0], None) for d in cursor.description]
+    names = [c[0].lower() for c in columns]
+    types = [c[1] for c in columns]
+    options = {}
+    if format == 'parquet':
+        options['arrow_types'] = [get_arrow_type(c, skip_types) for c in columns]
+    count = write(path, names, iter_batches(cursor, batch_size), types, skip_types, **options)
+    logger.info('Extracted {} rows from {} to {}'.format(count, table, path))
+    return path
+
+
+class ExtractState(object):
+    """Watermarks of the last exported rows, checkpointed to a JSON file.
+
+    Each table's entry holds the last watermark value and the output file
+    offset it corresponds to, so an interrupted run can truncate any
+    partially written rows and continue from there.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as file:
+                self._state = json.load(file)
+        else:
+            self._state = {}
+
+    def get(self, table):
+        entry = self._state.get(table)
+        if entry is None:
+            return None, None
+        return decode_watermark(entry['value'], entry['type']), entry['offset']
+
+    def set(self, table, value, offset):
+        value, type = encode_watermark(value)
+        with self._lock:
+            self._state[table] = {'value': value, 'type': type, 'offset': offset}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as file:
+                json.dump(self._state, file)
+            os.replace(tmp_path, self.path)
+
+
+def encode_watermark(value):
+    if isinstance(value, datetime):
+        return value.isoformat(), 'datetime'
+    elif isinstance(value, date):
+        return value.isoformat(), 'date'
+    elif isinstance(value, Decimal):
+        return str(value), 'decimal'
+    elif isinstance(value, (bytes, bytearray)):
+        return binascii.hexlify(value).decode('ascii'), 'bytes'
+    return value, 'raw'
+
+
+def decode_watermark(value, type):
+    if type == 'datetime':
+        return datetime.fromisoformat(value)
+    elif type == 'date':
+        return date.fromisoformat(value)
+    elif type == 'decimal':
+        return Decimal(value)
+    elif type == 'bytes':
+        return binascii.unhexlify(value)
+    return value
+
+
+PLACEHOLDERS = {
+    'qmark': '?',
+    'format': '%s',
+    'pyformat': '%s',
+    'numeric': ':1',
+    'named': ':watermark',
+}
+
+
+def get_placeholder(conn):
+    module = sys.modules.get(type(conn).__module__.split('.')[0])
+    return PLACEHOLDERS[getattr(module, 'paramstyle', 'format')]
+
+
+def copy_table_incremental(conn, table, watermark, state, out_dir='.', columns=None,
+                           batch_size=10000, skip_types=SKIP_TYPES):
+    """Append rows newer than the last recorded watermark to a CSV file.
+
+    Rows are fetched in watermark order and the state is checkpointed
+    after every batch. Rows sharing the batch's last watermark value are
+    held back to the next checkpoint, so each checkpoint covers every row
+    with its value and resuming with `>` loses none.
+    """
+    path = os.path.join(out_dir, table.lower() + '.csv')
+    last, offset = state.get(table)
+    cursor = conn.cursor()
+    if last is None:
+        cursor.execute('SELECT * FROM {} ORDER BY {}'.format(table, watermark))
+    else:
+        placeholder = get_placeholder(conn)
+        params = {'watermark': last} if placeholder == ':watermark' else (last,)
+        cursor.execute('SELECT * FROM {} WHERE {} > {} ORDER BY {}'.format(
+            table, watermark, placeholder, watermark
+        ), params)
+    if columns is None:
+        columns = [(d[0], None) for d in cursor.description]
+    names = [c[0].lower() for c in columns]
+    types = [c[1] for c in columns]
+    index = names.index(watermark.lower())
+    append = last is not None and os.path.exists(path)
+    count = 0
+    with open(path, 'a' if append else 'w', newline='') as out_file:
+
+        # Drop anything written after the last checkpoint.
+        if append:
+            out_file.truncate(offset)
+        writer = csv.writer(out_file, quoting=csv.QUOTE_ALL)
+        if not append:
+            writer.writerow(names)
+        held = []
+        for rows in iter_batches(cursor, batch_size):
+            rows = held + list(rows)
+            last = rows[-1][index]
+            cut = len(rows)
+            while cut > 0 and rows[cut - 1][index] == last:
+                cut -= 1
+            held = rows[cut:]
+            if cut:
+                count += _write_checkpoint(writer, out_file, state, table, rows[:cut], index, types, skip_types)
+        if held:
+            count += _write_checkpoint(writer, out_file, state, table, held, index, types, skip_types)
+    logger.info('Extracted {} new rows from {} to {}'.format(count, table, path))
+    return path
+
+
+def _write_checkpoint(writer, out_file, state, table, rows, index, types, skip_types):
+    writer.writerows([encode_row(r, types, skip_types) for r in rows])
+    out_file.flush()
+    state.set(table, rows[-1][index], out_file.tell())
+    return len(rows)
+
+
+def copy_data_csv(in_conn, table, columns, batch_size=10000):
+    return copy_table(in_conn, table, columns=columns, batch_size=batch_size)
+
+
+def extract_tables(connect, tables, out_dir='.', max_workers=4, batch_size=10000,
+                   format='csv', columns=get_columns, skip_types=SKIP_TYPES,
+                   watermarks=None, state_path=None):
+    """Extract several tables at once over a pool of connections.
+
+    `connect` is a callable returning a new DB-API connection. `columns`
+    is a callable returning the column info for a table, or None to use
+    the cursor description. Tables named in `watermarks` (a mapping of
+    table to watermark column) are extracted incrementally to CSV, with
+    progress recorded in the JSON file at `state_path`. Returns a mapping
+    of table to output path.
+    """
+    pool = ConnectionPool(connect)
+    watermarks = watermarks or {}
+    state = None
+    if watermarks:
+        if state_path is None:
+            state_path = os.path.join(out_dir, 'extract_state.json')
+        state = ExtractState(state_path)
+
+    def extract(table):
+        with pool.connection() as conn:
+            cols = columns(conn, table) if columns else None
+            if table in watermarks:
+                return copy_table_incremental(
+                    conn, table, watermarks[table], state, out_dir, cols, batch_size, skip_types
+                )
+            return copy_table(conn, table, out_dir, cols, batch_size, format, skip_types)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(tables, executor.map(extract, tables)))
+    finally:
+        pool.close()
+
+
+def main(argv=None):
+    import pymssql
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--in-host')
+    parser.add_argument('--in-port')
+    parser.add_argument('--in-user')
+    parser.add_argument('--in-pass')
+    parser.add_argument('--in-dbname')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--format', choices=sorted(WRITERS.keys()), default='csv')
+    parser.add_argument('--watermark', action='append', default=[],
+                        help='Incrementally extract a table by column, as TABLE=COLUMN.')
+    parser.add_argument('--state', help='Path of the incremental extraction state file.')
+    args = parser.parse_args(argv)
+    watermarks = dict([w.split('=', 1) for w in args.watermark])
+
+    def connect():
+        return pymssql.connect(
+            args.in_host, args.in_user, args.in_pass, args.in_dbname,
+            port=args.in_port
+        )
+
+    conn = connect()
+    try:
+        tables = list_tables(conn, args.in_dbname)
+    finally:
+        conn.close()
+    extract_tables(
+        connect, tables, args.out_dir, max_workers=args.workers,
+        batch_size=args.batch_size, format=args.format,
+        watermarks=watermarks, state_path=args.state
+    )
+
+
+if __name__ == '__main__':
+    main()
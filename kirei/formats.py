@@ -0,0 +1,234 @@
+import io
+import os
+import six
+import csv
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+}
+
+COLUMNAR = ('parquet', 'feather')
+
+# Options that stop a CSV file being split at byte offsets.
+SERIAL_OPTIONS = set([
+    'nrows', 'skiprows', 'skipfooter', 'chunksize', 'iterator', 'escapechar',
+    'quotechar', 'compression', 'comment', 'lineterminator', 'header',
+])
+
+BLOCK_SIZE = 1 << 24
+
+
+def get_format(path, format=None):
+    """Pick a file format, explicitly or from the path's extension.
+    """
+    if format is not None:
+        return format
+    if isinstance(path, six.string_types):
+        ext = os.path.splitext(path)[1].lower()
+        return EXTENSIONS.get(ext, 'csv')
+    return 'csv'
+
+
+def find_boundaries(path, count):
+    """Find up to `count` byte offsets splitting a CSV file into records.
+
+    Quotes are counted from the start of the file so that a split is
+    never placed on a newline inside a quoted field.
+    """
+    size = os.path.getsize(path)
+    targets = [size * ii // count for ii in range(1, count)]
+    offsets = []
+    parity = 0
+    pos = 0
+    with open(path, 'rb') as file:
+        for target in targets:
+            if offsets and target <= offsets[-1]:
+                continue
+
+            # Count quotes up to the target offset.
+            while pos < target:
+                block = file.read(min(BLOCK_SIZE, target - pos))
+                if not block:
+                    break
+                parity = (parity + block.count(b'"')) % 2
+                pos += len(block)
+
+            # Move forward to the first newline outside of quotes.
+            while True:
+                block = file.read(1 << 16)
+                if not block:
+                    return offsets
+                for ii, char in enumerate(bytearray(block)):
+                    if char == 34:
+                        parity ^= 1
+                    elif char == 10 and not parity:
+                        pos += ii + 1
+                        file.seek(pos)
+                        offsets.append(pos)
+                        break
+                else:
+                    pos += len(block)
+                    continue
+                break
+    return offsets
+
+
+def _read_csv_range(path, header, start, end, options):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return pd.read_csv(io.BytesIO(header + data), header=0, **options)
+
+
+def _concat_frames(frames):
+    categories = {}
+    for name in frames[0].columns:
+        if all([isinstance(f[name].dtype, pd.CategoricalDtype) for f in frames]):
+            categories[name] = union_categoricals([f[name] for f in frames])
+    df = pd.concat(frames, ignore_index=True)
+    for name, values in categories.items():
+        df[name] = pd.Categorical(values)
+    return df
+
+
+def read_csv_parallel(path, workers, min_chunk_bytes=1 << 26, **options):
+    """Parse a large CSV file in pieces on a process pool.
+
+    The file is split on record boundaries and each piece is parsed with
+    the same options. Falls back to a serial read for file-like sources,
+    small files and options that make splitting unsafe.
+    """
+    if (not isinstance(path, six.string_types) or SERIAL_OPTIONS & set(options.keys()) or
+            os.path.splitext(path)[1].lower() in ('.gz', '.bz2', '.zip', '.xz')):
+        return pd.read_csv(path, header=0, **options)
+    size = os.path.getsize(path)
+    count = min(workers, max(1, size // min_chunk_bytes))
+    if count < 2:
+        return pd.read_csv(path, header=0, **options)
+    with open(path, 'rb') as file:
+        header = file.readline()
+    offsets = find_boundaries(path, count)
+    starts = [len(header)] + offsets
+    ends = offsets + [size]
+    ranges = [(s, e) for s, e in zip(starts, ends) if e > s]
+    if 'usecols' in options:
+        options['usecols'] = list(options['usecols'])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        frames = _read_ranges(executor, path, header, ranges, options)
+
+        # Pieces infer their own dtypes, so a column can look numeric in
+        # one and textual in another. Reread such columns as strings, as a
+        # serial read would have.
+        mixed = _mixed_columns(frames, options)
+        if mixed:
+            dtype = dict(options.get('dtype', {}), **dict([(n, str) for n in mixed]))
+            frames = _read_ranges(executor, path, header, ranges, dict(options, dtype=dtype))
+    return _concat_frames(frames)
+
+
+def _read_ranges(executor, path, header, ranges, options):
+    futures = [
+        executor.submit(_read_csv_range, path, header, s, e, options)
+        for s, e in ranges
+    ]
+    return [f.result() for f in futures]
+
+
+def _mixed_columns(frames, options):
+    """Find columns without an explicit type whose pieces were inferred
+    as different kinds of values.
+    """
+    dtype = options.get('dtype', {})
+    if not isinstance(dtype, dict):
+        return []
+    fixed = set(dtype.keys()) | set(options.get('parse_dates', None) or [])
+    mixed = []
+    for name in frames[0].columns:
+        if name in fixed:
+            continue
+        types = [f[name].dtype for f in frames]
+        if all([t == types[0] for t in types]):
+            continue
+        numeric = [
+            pd.api.types.is_numeric_dtype(t) and not pd.api.types.is_bool_dtype(t)
+            for t in types
+        ]
+        if not all(numeric):
+            mixed.append(name)
+    return mixed
+
+
+def read_frame(path, format=None, workers=None, **options):
+    """Read a source file, applying `read_csv` style options to any format.
+
+    Columnar formats only read the `usecols` columns, keep their stored
+    dtypes and only convert the columns given in `dtype` and
+    `parse_dates`.
+    """
+    format = get_format(path, format)
+    if format == 'csv':
+        if workers and workers > 1:
+            return read_csv_parallel(path, workers, **options)
+        return pd.read_csv(path, header=0, **options)
+    usecols = options.get('usecols', None)
+    columns = list(usecols) if usecols is not None else None
+    if format == 'parquet':
+        df = pd.read_parquet(path, columns=columns)
+    elif format == 'feather':
+        df = pd.read_feather(path, columns=columns)
+    else:
+        raise Exception('Unknown file format: "{}"'.format(format))
+    for name, type in options.get('dtype', {}).items():
+        if name in df and df[name].dtype != type:
+            df[name] = df[name].astype(type)
+    for name in options.get('parse_dates', []):
+        if not pd.api.types.is_datetime64_any_dtype(df[name]):
+            df[name] = pd.to_datetime(df[name])
+    return df
+
+
+def iter_frames(path, chunksize, format=None, **options):
+    format = get_format(path, format)
+    if format == 'csv':
+        for chunk in pd.read_csv(path, header=0, chunksize=chunksize, **options):
+            yield chunk
+    elif format == 'parquet':
+        import pyarrow.parquet as pq
+        usecols = options.get('usecols', None)
+        columns = list(usecols) if usecols is not None else None
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        raise Exception('Streaming is not supported for {} files'.format(format))
+
+
+def write_frame(df, path, format=None, append=False, **info):
+    """Write a frame as CSV, Parquet or Feather.
+
+    Columnar formats can't be appended to.
+    """
+    format = get_format(path, format)
+    if format == 'csv':
+        if append:
+            info.update(mode='a', header=False)
+        df.to_csv(path, index=False, quoting=csv.QUOTE_MINIMAL, **info)
+        return
+    if append:
+        raise Exception('Cannot append to {} file "{}"'.format(format, path))
+    columns = info.pop('columns', None)
+    if columns is not None:
+        df = df[list(columns)]
+    if format == 'parquet':
+        df.to_parquet(path, index=False, **info)
+    elif format == 'feather':
+        df.reset_index(drop=True).to_feather(path, **info)
+    else:
+        raise Exception('Unknown file format: "{}"'.format(format))
@@ -1,6 +1,7 @@
 import six
 
 import numpy as np
+import pandas as pd
 
 
 def clean_string(value):
@@ -10,3 +11,30 @@ def clean_string(value):
     if not value:
         return np.nan
     return value
+
+
+def clean_series(series):
+    """Vectorized version of `clean_string` for a whole column.
+
+    Numeric, boolean and datetime columns are returned untouched.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Mapping a categorical only visits the categories.
+        return series.map(clean_string)
+    if not (series.dtype == object or pd.api.types.is_string_dtype(series.dtype)):
+        return series
+    if series.empty:
+        return series
+    cleaned = series.str.replace(u'\xa0', u' ', regex=False).str.strip()
+
+    # Non-string values come back from the `str` accessor as nulls.
+    is_str = cleaned.notnull()
+    if not is_str.any():
+        return series
+    result = series.where(~is_str, cleaned)
+    empty = is_str & (cleaned == '')
+    if empty.any():
+        result[empty] = np.nan
+    if series.dtype == object:
+        result = result.infer_objects()
+    return result
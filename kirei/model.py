@@ -2,6 +2,7 @@ import six
 import logging
 
 from django.apps import apps
+from django.db import transaction
 
 from .config import get_config
 from .utils import *
@@ -24,7 +25,74 @@ def get_model(model):
     return model
 
 
-def handle_fk(row, values, info):
+class FKCache(object):
+    """Cache of FK lookups for a single save, keyed on the lookup values.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._cache = {}
+
+    def _key(self, model, kwargs):
+        return (model, tuple(sorted(kwargs.items())))
+
+    def prefetch(self, df, specs):
+        """Load the referenced rows for each FK spec, in chunks of keys.
+        """
+        for name, info in specs.items():
+            model = get_model(info['model'])
+            srcs = [s for s in info['fields'].keys() if s in df]
+            if len(srcs) != len(info['fields']):
+                continue
+            dsts = [info['fields'][s] for s in srcs]
+
+            # Related lookups can't be read back off the instances.
+            if any(['__' in d for d in dsts]):
+                continue
+            keys = df[srcs].dropna().drop_duplicates()
+            if keys.empty:
+                continue
+            found = {}
+            size = max(MAX_QUERY_PARAMS // len(srcs), 1)
+            for start in range(0, len(keys), size):
+                chunk = keys.iloc[start:start + size]
+                kwargs = dict([(d + '__in', chunk[s].unique().tolist()) for s, d in zip(srcs, dsts)])
+                for inst in model.objects.filter(**kwargs):
+                    lookup = dict([(d, getattr(inst, d)) for d in dsts])
+
+                    # Composite lookups can match the same row in several chunks.
+                    found.setdefault(self._key(model, lookup), {})[inst.pk] = inst
+            found = dict([(k, list(v.values())) for k, v in found.items()])
+            self._cache.update(found)
+            logger.info('Prefetched {} {} instances for {}'.format(
+                sum(map(len, found.values())), model.__name__, name
+            ))
+
+    def get(self, model, kwargs):
+        key = self._key(model, kwargs)
+        insts = self._cache.get(key)
+        if insts is None:
+            self.misses += 1
+            insts = list(model.objects.filter(**kwargs)[:2])
+
+            # Don't cache missing rows, they may be created later.
+            if insts:
+                self._cache[key] = insts
+        else:
+            self.hits += 1
+        if not insts:
+            raise model.DoesNotExist(
+                '{} matching query does not exist.'.format(model._meta.object_name)
+            )
+        if len(insts) > 1:
+            raise model.MultipleObjectsReturned(
+                'get() returned more than one {}'.format(model._meta.object_name)
+            )
+        return insts[0]
+
+
+def handle_fk(row, values, info, fk_cache=None):
     """Try and get value from `values` first, as this will contain other
     FKs.
     """
@@ -40,6 +108,8 @@ def handle_fk(row, values, info):
         return None
     #
     try:
+        if fk_cache is not None:
+            return fk_cache.get(model, kwargs)
         return model.objects.get(**kwargs)
     except (model.DoesNotExist, model.MultipleObjectsReturned) as err:
         err.args = (err.args[0] + ': {}'.format(kwargs),)
@@ -56,18 +126,10 @@ def resolve_callable(value, table):
     return value
 
 
-def save_instance(table, model, row, **kwargs):
+def save_instance(table, model, row, fk_cache=None, **kwargs):
     unique = to_list(kwargs.get('unique', []))
-    exclude = to_set(kwargs.get('exclude', []))
-    include = to_set(kwargs.get('include', []))
-    if len(include) == 0:
-        include |= set(row.axes[0].values)
-    include -= exclude
-    values = dict([(v, row[v]) for v in row.axes[0].values if not is_na(row[v])])
-    for name, info in kwargs.get('fields', {}).items():
-        val = handle_fk(row, values, info)
-        if val is not None:
-            values[name] = val
+    include = get_include(row, kwargs)
+    values = build_row_values(row, kwargs, fk_cache)
     if unique:
         creator = resolve_callable(kwargs.get('get_or_creator', model.objects.update_or_create), table)
         unique_values = []
@@ -90,12 +152,166 @@ def save_instance(table, model, row, **kwargs):
     return inst, created
 
 
+def build_row_values(row, info, fk_cache=None):
+    """Collect the non-null values of a row, resolving FK fields.
+    """
+    values = dict([(v, row[v]) for v in row.axes[0].values if not is_na(row[v])])
+    for name, fk_info in info.get('fields', {}).items():
+        val = handle_fk(row, values, fk_info, fk_cache)
+        if val is not None:
+            values[name] = val
+    return values
+
+
+def get_include(row, info):
+    exclude = to_set(info.get('exclude', []))
+    include = to_set(info.get('include', []))
+    if len(include) == 0:
+        include |= set(row.axes[0].values)
+    return include - exclude
+
+
+# Keep lookups well under database parameter limits (2100 on MSSQL).
+MAX_QUERY_PARAMS = 1000
+
+
+def fetch_existing(model, unique, keys):
+    """Fetch the instances matching a set of unique keys.
+
+    Keys are looked up in chunks. Composite keys are prefiltered with an
+    `__in` per field and matched exactly here.
+    """
+    keys = list(keys)
+    existing = {}
+    size = max(MAX_QUERY_PARAMS // len(unique), 1)
+    for start in range(0, len(keys), size):
+        chunk = keys[start:start + size]
+        query = dict([
+            (name + '__in', list(set([k[ii] for k in chunk])))
+            for ii, name in enumerate(unique)
+        ])
+        wanted = set(chunk)
+        for inst in model.objects.filter(**query):
+            key = get_instance_key(model, unique, inst)
+            if key in wanted:
+                existing[key] = inst
+    return existing
+
+
+def get_key_value(field, value):
+    """Convert a value to the Python type of a model field, so keys from
+    DataFrame values and from instances compare equal.
+    """
+    if value is None:
+        return None
+    if field.is_relation:
+        return field.target_field.to_python(getattr(value, 'pk', value))
+    return field.to_python(value)
+
+
+def get_row_key(model, unique, values):
+    return tuple([
+        get_key_value(model._meta.get_field(n), values.get(n)) for n in unique
+    ])
+
+
+def get_instance_key(model, unique, inst):
+    key = []
+    for name in unique:
+        field = model._meta.get_field(name)
+        key.append(get_key_value(field, getattr(inst, field.attname)))
+    return tuple(key)
+
+
+def save_batch(table, model, df, info, fk_cache=None):
+    """Save a batch of rows using `bulk_create` and `bulk_update`.
+
+    Returns a list of (row, instance, created) tuples.
+    """
+    unique = to_list(info.get('unique', []))
+    rows = []
+    for ii, row in df.iterrows():
+        values = build_row_values(row, info, fk_cache)
+        include = get_include(row, info)
+        key = get_row_key(model, unique, values) if unique else None
+        rows.append((row, values, include, key))
+    existing = {}
+    if unique:
+        existing = fetch_existing(model, unique, set([r[3] for r in rows if None not in r[3]]))
+    creates = []
+    updates = {}
+    update_fields = set()
+    pending = {}
+    results = []
+    for row, values, include, key in rows:
+        inst = None
+        if unique:
+            inst = existing.get(key, pending.get(key))
+        if inst is None:
+            inst = model(**build_values(values, include))
+            if unique:
+                pending[key] = inst
+            creates.append(inst)
+            created = True
+        else:
+            defaults = build_values(values, include - set(unique))
+            for name, value in defaults.items():
+                setattr(inst, name, value)
+            if inst.pk is not None:
+                updates[inst.pk] = inst
+                update_fields |= set(defaults.keys())
+            created = False
+        results.append((row, inst, created))
+    batch_size = info.get('batch_size', 1000)
+    if creates:
+        model.objects.bulk_create(creates, batch_size=batch_size)
+    if updates and update_fields:
+        model.objects.bulk_update(list(updates.values()), sorted(update_fields), batch_size=batch_size)
+    return results
+
+
+def save_model_bulk(table, df, model, info, fk_cache=None):
+    """Save a DataFrame in batches inside a single transaction.
+
+    Custom `creator` and `get_or_creator` callables are not used in bulk
+    mode.
+    """
+    batch_size = info.get('batch_size', 1000)
+    post = getattr(table, 'post_save_model', None)
+    with transaction.atomic():
+        for start in range(0, len(df), batch_size):
+            results = save_batch(table, model, df.iloc[start:start + batch_size], info, fk_cache)
+            if post:
+                for row, inst, created in results:
+                    post(row, inst, created)
+    logger.info('Bulk saved {} {} instances'.format(len(df), model.__name__))
+
+
 def save_model(table, df, model_name, info):
+    """Save a DataFrame to a model, returning False if model output is
+    turned off.
+    """
     if not get_config('models', True) and not getattr(table, 'force_model_output', False):
-        return
+        return False
     model = get_model(model_name)
+    fk_cache = None
+    if info.get('cache_fks', True) and info.get('fields'):
+        fk_cache = FKCache()
+        fk_cache.prefetch(df, info['fields'])
+    if info.get('bulk', False):
+        save_model_bulk(table, df, model, info, fk_cache)
+    else:
+        save_rows(table, df, model, info, fk_cache)
+    if fk_cache is not None:
+        logger.info('FK cache for {}: {} hits, {} misses'.format(
+            model.__name__, fk_cache.hits, fk_cache.misses
+        ))
+    return True
+
+
+def save_rows(table, df, model, info, fk_cache=None):
     for ii, row in df.iterrows():
-        inst, created = save_instance(table, model, row, **info)
+        inst, created = save_instance(table, model, row, fk_cache, **info)
         post = getattr(table, 'post_save_model', None)
         if post:
             post(row, inst, created)
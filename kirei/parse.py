@@ -3,14 +3,25 @@ import six
 from decimal import Decimal, InvalidOperation
 from datetime import timedelta
 import logging
+import warnings
 
 from dateutil.parser import parse as _parse_date
 from django.core.exceptions import ValidationError
 import numpy as np
+import pandas as pd
 
 from .utils import is_empty
 
 
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:
+    try:
+        from pandas._libs.tslibs.parsing import guess_datetime_format
+    except ImportError:
+        guess_datetime_format = None
+
+
 logger = logging.getLogger(__name__)
 
 
@@ -81,3 +92,166 @@ def parse_duration(duration_str, error='raise'):
 
 def duration_parser(error='raise'):
     return lambda x: parse_duration(x, error)
+
+
+def _string_mask(series):
+    if series.dtype == object:
+        return series.map(lambda x: isinstance(x, six.string_types)).astype(bool)
+    elif pd.api.types.is_string_dtype(series.dtype):
+        return series.notnull()
+    return pd.Series(False, index=series.index)
+
+
+def _report(errors, error):
+    """Report a list of (row index, message) failures in bulk.
+    """
+    if not errors:
+        return
+    msgs = ['Row {}: {}'.format(ii, msg) for ii, msg in errors]
+    if error == 'raise':
+        raise ValidationError(msgs)
+    elif error == 'log':
+        for msg in msgs:
+            logger.error(msg)
+
+
+def guess_date_format(values, sample=100):
+    """Guess a format for date strings that agrees with `parse_date`.
+
+    Formats with a numeric day before the month are rejected, as
+    `dateutil` reads ambiguous dates month first.
+    """
+    if guess_datetime_format is None:
+        return None
+    with warnings.catch_warnings():
+        # Day first formats are rejected below, so ignore pandas' warning.
+        warnings.simplefilter('ignore', UserWarning)
+        format = guess_datetime_format(values.iloc[0])
+    if format is None:
+        return None
+    if '%d' in format and '%m' in format and format.index('%d') < format.index('%m'):
+        return None
+    for value in values.drop_duplicates().iloc[:sample]:
+        try:
+            expected = parse_date(value)
+        except ValidationError:
+            continue
+        parsed = pd.to_datetime(value, format=format, errors='coerce')
+        if not pd.isnull(parsed) and parsed != expected:
+            return None
+    return format
+
+
+def parse_dates(series, format=None, error='raise'):
+    """Series version of `parse_date`.
+
+    The format is inferred from the first string and used to convert the
+    whole column at once, provided it reads a sample of the values the
+    same way `dateutil` does. Anything not matching falls back to
+    `dateutil`. Non-string values are left as is.
+    """
+    mask = _string_mask(series)
+    if not mask.any():
+        return series
+    values = series[mask]
+    if format is None:
+        format = guess_date_format(values)
+    if format is not None:
+        parsed = pd.to_datetime(values, format=format, errors='coerce')
+    else:
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    parsed = parsed.astype(object)
+
+    # Fall back to dateutil for anything that didn't match.
+    missed = parsed.isnull()
+    errors = []
+    if missed.any():
+        cache = {}
+        for ii, value in values[missed].items():
+            if value not in cache:
+                try:
+                    cache[value] = parse_date(value)
+                except ValidationError as err:
+                    cache[value] = err
+            res = cache[value]
+            if isinstance(res, ValidationError):
+                errors.append((ii, res.messages[0]))
+            else:
+                parsed[ii] = res
+    _report(errors, error)
+
+    result = series.where(~mask, parsed)
+    if series[~mask].isnull().all():
+        result = pd.to_datetime(result, errors='coerce')
+    return result
+
+
+def parse_bools(series, error='raise'):
+    """Series version of `parse_bool`.
+    """
+    mask = _string_mask(series)
+    result = series.astype(object).astype(bool)
+    errors = []
+    if mask.any():
+        values = series[mask].str.lower()
+        true = values.str.contains('[y1t]', regex=True)
+        false = ~true & values.str.contains('[n0f]', regex=True)
+        invalid = ~(true | false)
+        result[mask] = true
+        if invalid.any():
+            errors = [
+                (ii, 'Unable to parse boolean "{}"'.format(value))
+                for ii, value in values[invalid].items()
+            ]
+            result = result.astype(object)
+            result[invalid[invalid].index] = np.nan
+    _report(errors, error)
+    return result
+
+
+def parse_decimals(series, error='raise'):
+    """Series version of `parse_decimal`.
+
+    Each distinct value is only parsed once. Null values are left as NaN.
+    """
+    notnull = series.notnull()
+    lookup = {}
+    bad = {}
+    for value in pd.unique(series[notnull]):
+        try:
+            lookup[value] = parse_decimal(value)
+        except ValidationError as err:
+            bad[value] = err.messages[0]
+    errors = []
+    if bad:
+        invalid = series[notnull & series.isin(list(bad.keys()))]
+        errors = [(ii, bad[value]) for ii, value in invalid.items()]
+    _report(errors, error)
+    return series.map(lookup)
+
+
+def parse_durations(series, error='raise'):
+    """Series version of `parse_duration`.
+
+    Components are extracted with `DURATION_PROG` for the whole column
+    and combined arithmetically. Empty values become NaT.
+    """
+    mask = series.notnull() & (series.astype(object) != '')
+    values = series[mask]
+    parts = values.astype(object).str.extract(DURATION_PROG.pattern, flags=re.I)
+    parts = parts[['days', 'hours', 'minutes', 'seconds']].astype(float)
+    invalid = parts.isnull().all(axis=1)
+    errors = [
+        (ii, 'Failed to parse duration: "{}".'.format(value))
+        for ii, value in values[invalid].items()
+    ]
+    _report(errors, error)
+    seconds = (
+        parts['days'].fillna(0) * 86400 +
+        parts['hours'].fillna(0) * 3600 +
+        parts['minutes'].fillna(0) * 60 +
+        parts['seconds'].fillna(0)
+    )
+    seconds[invalid] = np.nan
+    result = pd.to_timedelta(seconds, unit='s')
+    return result.reindex(series.index)
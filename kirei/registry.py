@@ -2,9 +2,15 @@ import os
 import six
 from collections import OrderedDict
 import logging
+from concurrent.futures import (
+    ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+)
 
 import pandas as pd
 
+from .config import get_config
+from .shared import SharedFrame, share_frame, start_tracker, release
+from .stats import get_stats
 from .utils import to_list
 
 
@@ -14,6 +20,9 @@ _all_table_cls = OrderedDict()
 _all_tables = OrderedDict()
 _ordered_tables = []
 
+# Tables installed in a worker process by its current task.
+_worker_tables = []
+
 
 def register_tables(tables):
     for tbl in tables:
@@ -43,27 +52,163 @@ def iter_tables():
         yield table
 
 
-def order_tables():
-    done = set()
-    for table in _all_tables.values():
-        _order_tables(table, done)
-    logger.info('Ordered tables {}'.format([t.name for t in _ordered_tables]))
+def iter_dependencies(table):
+    """Iterate over the tables `table` needs processed before it.
+    """
+    for dep in table.iter_dependencies():
+        if dep is not None and dep is not table:
+            yield dep
 
 
-def _order_tables(table, done):
-    if table in done:
-        return
-    done.add(table)
-    for jt in table.iter_dependencies():
-        _order_tables(jt, done)
-    _ordered_tables.append(table)
+def order_tables(tables=None):
+    """Order tables such that dependencies come before dependents.
 
+    Raises an exception if a dependency cycle is found.
+    """
+    global _ordered_tables
+    if tables is None:
+        tables = _all_tables.values()
+    ordered = []
+    state = {}
+    for table in tables:
+        _order_tables(table, state, ordered, [])
+    _ordered_tables = ordered
+    logger.info('Ordered tables {}'.format([t.name for t in ordered]))
+    return ordered
 
-def run(in_root=None, out_root=None, include=[]):
+
+def _order_tables(table, state, ordered, path):
+    status = state.get(table)
+    if status == 'done':
+        return
+    path = path + [table]
+    if status == 'visiting':
+        raise Exception('Cyclic table dependencies: {}'.format(
+            ' -> '.join([t.name for t in path[path.index(table):]])
+        ))
+    state[table] = 'visiting'
+    for dep in iter_dependencies(table):
+        _order_tables(dep, state, ordered, path)
+    state[table] = 'done'
+    ordered.append(table)
+
+
+def _pack_table(table, handles):
+    """Get a table's state for another process, with its data in shared
+    memory where possible.
+    """
+    state = dict(table.__dict__)
+    data = state.get('data', None)
+    if data is not None and get_config('shared_memory', True):
+        shared = state.pop('_shared', None)
+        if shared is None or shared[0] != id(data) or shared[1].unlinked:
+            handle = share_frame(data)
+            shared = (id(data), handle) if handle is not None else None
+            table._shared = shared
+            if handle is not None:
+                handles.append(handle)
+        if shared is not None:
+            state['data'] = shared[1]
+    return type(table), state
+
+
+def _unpack_table(cls, state):
+    table = cls.__new__(cls)
+    table.__dict__.update(state)
+    if isinstance(state.get('data', None), SharedFrame):
+        table.data = state['data'].attach()
+        table._shared = (id(table.data), state['data'])
+    return table
+
+
+def _process_table(table, deps):
+    """Process a table inside a worker process.
+
+    The worker has its own copy of the registry, so the already processed
+    dependencies are installed before processing. Dependencies arrive in
+    shared memory created by the parent, which also unlinks it. Tables
+    and blocks from the worker's previous task are released first.
+    """
+    while _worker_tables:
+        _all_tables.pop(_worker_tables.pop(), None)
+    release()
+    for dep in deps:
+        dep = _unpack_table(*dep)
+        _all_tables[dep.name] = dep
+        _worker_tables.append(dep.name)
+    table = _unpack_table(*table)
+    _all_tables[table.name] = table
+    _worker_tables.append(table.name)
+    table.process()
+    state = dict(table.__dict__)
+    state.pop('_shared', None)
+    return state
+
+
+def _get_executor(executor, max_workers):
+    if executor == 'thread':
+        return ThreadPoolExecutor(max_workers=max_workers)
+    elif executor == 'process':
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise Exception('Unknown executor: "{}"'.format(executor))
+
+
+def process_tables(tables, max_workers=1, executor='thread'):
+    """Process tables, running independent tables concurrently if
+    `max_workers` isn't 1.
+
+    A table is submitted as soon as all of its dependencies are done, so
+    wall-clock time scales with the depth of the dependency graph. Tables
+    used by `update_from` and friends must be listed in `depends` to run
+    concurrently.
+    """
+    ordered = order_tables(tables)
+    if max_workers == 1:
+        for table in ordered:
+            table.process()
+        return
+    deps = dict([(t, set(iter_dependencies(t))) for t in ordered])
+    done = set()
+    pending = {}
+    handles = []
+    try:
+        _run_pool(ordered, deps, done, pending, handles, max_workers, executor)
+    finally:
+        for handle in handles:
+            handle.unlink()
+
+
+def _run_pool(ordered, deps, done, pending, handles, max_workers, executor):
+    if executor == 'process' and get_config('shared_memory', True):
+        start_tracker()
+    with _get_executor(executor, max_workers) as pool:
+        while len(done) < len(ordered):
+            for table in ordered:
+                if table in done or table in pending.values():
+                    continue
+                if deps[table] <= done:
+                    if executor == 'process':
+                        future = pool.submit(
+                            _process_table, _pack_table(table, handles),
+                            [_pack_table(d, handles) for d in deps[table]]
+                        )
+                    else:
+                        future = pool.submit(table.process)
+                    pending[future] = table
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                table = pending.pop(future)
+                result = future.result()
+                if executor == 'process':
+                    table.__dict__.update(result)
+                done.add(table)
+
+
+def run(in_root=None, out_root=None, include=[], max_workers=1, executor='thread'):
     global _all_tables
     logger.info('Running kirei')
     if in_root is None:
-        in_root = os.path.getcwd()
+        in_root = os.getcwd()
     for name, cls in _all_table_cls.items():
         if name not in _all_tables:
             table = cls(in_root, out_root=out_root, load=False)
@@ -73,20 +218,7 @@ def run(in_root=None, out_root=None, include=[]):
         include = list(_all_tables.values())
     for table in _all_tables.values():
         table.resolve_source()
-    for table in include:
-        table.process()
-    # order_tables()
-
-    # # Pass 1, load everything from files, clean data, filter.
-    # for table in _ordered_tables:
-    #     if table.source_type != 'file':
-    #         continue
-    #     table.load()
-    #     table.clean_all_fields()
-    #     table.filter()
-    #     table.check_unique()
-
-    # # Pass 2, 
-
-    # for table in _ordered_tables:
-    #     table.join_all_tables()
+    process_tables(include, max_workers=max_workers, executor=executor)
+    stats = get_stats()
+    if stats is not None:
+        logger.info('Table stats:\n{}'.format(stats.summary()))
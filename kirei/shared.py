@@ -0,0 +1,155 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:
+    shared_memory = None
+
+
+logger = logging.getLogger('kirei.shared')
+
+# Blocks attached in this process, kept open while frames use them.
+_attached = {}
+
+# Base frames over the shared blocks. Attached frames are shallow copies,
+# so copy-on-write copies a column before it is modified.
+_bases = []
+
+
+def start_tracker():
+    """Start the resource tracker before any worker processes.
+
+    Workers then share the parent's tracker, rather than starting their
+    own which would try to clean up blocks the parent owns.
+    """
+    if shared_memory is not None:
+        resource_tracker.ensure_running()
+
+
+def _open(name):
+    """Attach to an existing block, leaving it to the creator to unlink.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 the block is registered again with the
+        # (shared) resource tracker, which ignores duplicates.
+        return shared_memory.SharedMemory(name=name)
+
+
+def is_shareable(values):
+    return isinstance(values, np.ndarray) and values.dtype.kind in 'biufcmM' and values.nbytes > 0
+
+
+class SharedFrame(object):
+    """A picklable handle to a DataFrame held in shared memory.
+
+    Numeric, boolean and datetime columns, and the codes of categorical
+    columns, are copied into `multiprocessing.shared_memory` blocks once.
+    Other processes attach to the blocks without copying. Remaining
+    columns are pickled with the handle.
+    """
+
+    unlinked = False
+
+    def __init__(self, df):
+        self.index = df.index
+        self.columns = []
+        self.names = []
+        for name in df.columns:
+            col = df[name]
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                codes = self._share(col.cat.codes.to_numpy())
+                self.columns.append((name, 'category', (codes, col.cat.categories, col.cat.ordered)))
+            elif is_shareable(col.to_numpy()) and not pd.api.types.is_extension_array_dtype(col.dtype):
+                self.columns.append((name, 'array', self._share(col.to_numpy())))
+            else:
+                self.columns.append((name, 'object', col.array))
+
+    def _share(self, values):
+        shm = shared_memory.SharedMemory(create=True, size=values.nbytes)
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+        _attached[shm.name] = shm
+        self.names.append(shm.name)
+        return (shm.name, values.dtype.str, values.shape)
+
+    @staticmethod
+    def _attach(spec):
+        name, dtype, shape = spec
+        shm = _attached.get(name)
+        if shm is None:
+            shm = _open(name)
+            _attached[name] = shm
+        values = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        values.flags.writeable = False
+        return values
+
+    def attach(self):
+        """Build a DataFrame backed by the shared blocks.
+        """
+        data = {}
+        for name, kind, payload in self.columns:
+            if kind == 'array':
+                data[name] = pd.Series(self._attach(payload), index=self.index, copy=False)
+            elif kind == 'category':
+                codes, categories, ordered = payload
+                data[name] = pd.Series(pd.Categorical.from_codes(
+                    self._attach(codes), categories=categories, ordered=ordered
+                ), index=self.index)
+            else:
+                data[name] = pd.Series(payload, index=self.index, copy=False)
+        base = pd.DataFrame(data, index=self.index, copy=False)
+        _bases.append(base)
+        return base.copy(deep=False)
+
+    @property
+    def nbytes(self):
+        return sum([_attached[n].size for n in self.names if n in _attached])
+
+    def unlink(self):
+        """Remove the blocks, and unmap them from this process.
+        """
+        for name in self.names:
+            shm = _attached.pop(name, None)
+            if shm is None:
+                try:
+                    shm = _open(name)
+                except FileNotFoundError:
+                    continue
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+            _close(shm)
+        self.unlinked = True
+
+
+def _close(shm):
+    try:
+        shm.close()
+    except BufferError:
+        # Still viewed by a live array; unmapped when that is collected.
+        return False
+    return True
+
+
+def release():
+    """Drop the frames attached so far and unmap their blocks.
+
+    Called by reused worker processes between tasks.
+    """
+    del _bases[:]
+    for name, shm in list(_attached.items()):
+        if _close(shm):
+            _attached.pop(name)
+
+
+def share_frame(df):
+    """Put a DataFrame into shared memory, or return None if unavailable.
+    """
+    if shared_memory is None or df is None:
+        return None
+    return SharedFrame(df)
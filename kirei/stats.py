@@ -0,0 +1,260 @@
+"""Timing and memory statistics for table stages.
+
+Enable by setting a `Stats` instance in the config:
+
+    stats = Stats(memory=True)
+    set_config('stats', stats)
+    run(...)
+    print(stats.summary())
+    stats.close()
+
+Each stage of `Table.process` is recorded, as is each `clean_<field>` and
+`join_<name>` within it. Memory is measured with `tracemalloc` when
+`memory` is set, which slows processing; the process-wide peak is shared
+by concurrently running tables. Tables processed in worker processes
+are not recorded.
+"""
+import os
+import json
+import time
+import threading
+import tracemalloc
+
+from .config import get_config
+
+
+class Stats(object):
+    """Records of wall time, CPU time, row counts and memory per stage.
+
+    `hooks` are called with each record as its stage finishes.
+    """
+
+    def __init__(self, memory=False, hooks=None):
+        self.memory = memory
+        self.hooks = list(hooks or [])
+        self.records = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._tracing = False
+
+    def close(self):
+        """Stop tracing memory, if this started it.
+        """
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def measure(self, table, stage):
+        return _Measure(self, table, stage)
+
+    def get_stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def annotate(self, table, **values):
+        """Add values to the record of the innermost stage of `table`.
+        """
+        for frame in reversed(self.get_stack()):
+            if frame.table is table:
+                frame.extra.update(values)
+                return
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def totals(self):
+        """Total cost of each table, from its outermost stages.
+        """
+        totals = {}
+        for rec in self.records:
+            if rec['parent'] is not None:
+                continue
+            total = totals.setdefault(rec['table'], {'table': rec['table'], 'wall': 0.0, 'cpu': 0.0})
+            total['wall'] += rec['wall']
+            total['cpu'] += rec['cpu']
+        return sorted(totals.values(), key=lambda x: x['wall'], reverse=True)
+
+    def summary(self, limit=None):
+        """A report of stages and tables, most expensive first.
+        """
+        records = sorted(self.records, key=lambda x: x['wall'], reverse=True)
+        lines = ['{:<24} {:<24} {:>10} {:>10} {:>10} {:>10} {:>12}'.format(
+            'table', 'stage', 'wall (s)', 'cpu (s)', 'rows in', 'rows out', 'mem (MB)'
+        )]
+        for rec in records[:limit]:
+            lines.append('{:<24} {:<24} {:>10.4f} {:>10.4f} {:>10} {:>10} {:>12}'.format(
+                rec['table'], rec['stage'], rec['wall'], rec['cpu'],
+                _format(rec['rows_in']), _format(rec['rows_out']),
+                _format(rec['mem_peak'], 1 << 20),
+            ))
+        lines.append('')
+        lines.append('{:<24} {:>10} {:>10}'.format('table', 'wall (s)', 'cpu (s)'))
+        for total in self.totals():
+            lines.append('{:<24} {:>10.4f} {:>10.4f}'.format(
+                total['table'], total['wall'], total['cpu']
+            ))
+        return '\n'.join(lines)
+
+    def to_json(self, path=None):
+        """Dump the records as JSON, returning the string if no path is given.
+        """
+        data = {'records': self.records, 'totals': self.totals()}
+        if path is None:
+            return json.dumps(data, indent=2)
+        with open(path, 'w') as file:
+            json.dump(data, file, indent=2)
+
+    def to_chrome_trace(self, path=None):
+        """Dump the records in the Chrome trace event format, viewable in
+        chrome://tracing or Perfetto.
+        """
+        events = []
+        for rec in self.records:
+            events.append({
+                'name': rec['stage'],
+                'cat': rec['table'],
+                'ph': 'X',
+                'ts': rec['start'] * 1e6,
+                'dur': rec['wall'] * 1e6,
+                'pid': rec['pid'],
+                'tid': rec['thread'],
+                'args': dict([
+                    (k, v) for k, v in rec.items()
+                    if k not in ('stage', 'start', 'wall', 'pid', 'thread')
+                ]),
+            })
+        data = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+        if path is None:
+            return json.dumps(data)
+        with open(path, 'w') as file:
+            json.dump(data, file)
+
+
+class _Measure(object):
+
+    def __init__(self, stats, table, stage):
+        self.stats = stats
+        self.table = table
+        self.stage = stage
+        self.mem_peak = None
+        self.extra = {}
+
+    def __enter__(self):
+        stack = self.stats.get_stack()
+        self.parent = None
+        for outer in reversed(stack):
+            if outer.table is self.table:
+                self.parent = outer.stage
+                break
+        self.rows_in = _count_rows(self.table)
+        self.mem_start = None
+        if self.stats.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.stats._tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            _update_peaks(stack, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+            self.mem_peak = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start
+        cpu = time.thread_time() - self.cpu
+        stack = self.stats.get_stack()
+        stack.pop()
+        mem_delta = mem_peak = None
+        if self.mem_start is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            _update_peaks(stack + [self], peak)
+            mem_delta = current - self.mem_start
+            mem_peak = self.mem_peak - self.mem_start
+        record = {
+            'table': getattr(self.table, 'name', None),
+            'stage': self.stage,
+            'parent': self.parent,
+            'start': self.start - self.stats._origin,
+            'wall': wall,
+            'cpu': cpu,
+            'rows_in': self.rows_in,
+            'rows_out': _count_rows(self.table),
+            'mem_delta': mem_delta,
+            'mem_peak': mem_peak,
+            'pid': os.getpid(),
+            'thread': threading.get_ident(),
+            'error': exc[0].__name__ if exc[0] is not None else None,
+        }
+        for key, value in self.extra.items():
+            record.setdefault(key, value)
+        self.stats.add(record)
+        return False
+
+
+class _NullMeasure(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_null_measure = _NullMeasure()
+
+
+def get_stats():
+    return get_config('stats', None)
+
+
+def measure(table, stage):
+    """Context to record a stage of `table` when stats are enabled.
+    """
+    stats = get_stats()
+    if stats is None:
+        return _null_measure
+    return stats.measure(table, stage)
+
+
+def annotate(table, **values):
+    """Add values to the record of the current stage of `table`.
+    """
+    stats = get_stats()
+    if stats is not None:
+        stats.annotate(table, **values)
+
+
+def _update_peaks(frames, peak):
+    for frame in frames:
+        if frame.mem_peak is not None and peak > frame.mem_peak:
+            frame.mem_peak = peak
+
+
+def _count_rows(table):
+    data = getattr(table, 'data', None)
+    if data is None:
+        return None
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+def _format(value, scale=1):
+    if value is None:
+        return '-'
+    if scale == 1:
+        return str(value)
+    return '{:.1f}'.format(value / float(scale))
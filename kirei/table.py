@@ -5,27 +5,55 @@ import functools
 import logging
 from datetime import date
 import tempfile
+import threading
+import weakref
+from collections import OrderedDict
 
 import numpy as np
 import pandas as pd
 
 from .registry import register_table, get_table
 from .model import save_model
-from .funcs import clean_string
-from .utils import to_list
+from .funcs import clean_series
+from .formats import read_frame, iter_frames, write_frame, get_format, COLUMNAR
+from . import cache
+from .config import get_config
+from .dtypes import plan_categories, downcast, memory_report
+from .stats import measure, annotate
+from .utils import (
+    to_list, copy_on_write_enabled, shared_bytes, get_key_index, get_key_indexer,
+    take_values, assign_where, join_cardinality
+)
 
 
 logger = logging.getLogger('kirei.table')
 
 
+_run_locks = weakref.WeakKeyDictionary()
+_run_locks_lock = threading.Lock()
+
+
+def get_run_lock(obj, name):
+    with _run_locks_lock:
+        locks = _run_locks.setdefault(obj, {})
+        if name not in locks:
+            locks[name] = threading.RLock()
+        return locks[name]
+
+
 def run_once(f):
+    """Run a method once per instance.
+
+    Calls from other threads wait for a run in progress to finish.
+    """
     @functools.wraps(f)
     def wrapper(*args, **kwargs):
         attr = '_run_once_' + f.__name__
-        if getattr(args[0], attr, False):
-            return
-        setattr(args[0], attr, True)
-        f(*args, **kwargs)
+        with get_run_lock(args[0], f.__name__):
+            if getattr(args[0], attr, False):
+                return
+            setattr(args[0], attr, True)
+            f(*args, **kwargs)
     return wrapper
 
 
@@ -43,6 +71,22 @@ class Table(object):
     source = None
     fields = {}
     joins = {}
+    depends = []
+    chunksize = None
+    cacheable = True
+    incremental = False
+    source_format = None
+    share_source = False
+    read_workers = None
+    plan_dtypes = False
+    dtype_sample_rows = 10000
+    category_ratio = 0.5
+    downcast_integers = False
+    downcast_floats = False
+    downcast_unsigned = False
+    max_fanout = None
+    min_selectivity = None
+    cardinality_action = None
 
     def __init__(self, root=None, source=None, fields=None, load=True, out_root=None):
         if not hasattr(self, 'name'):
@@ -88,19 +132,170 @@ class Table(object):
             get_table(self.source).process()
         for dep in self.iter_join_tables():
             dep.process()
-        self.load()
-        self.clean_all_fields()
-        self.filter()
-        self.check_unique()
-        self.join_all_tables()
-        self.do_validate()
-        self.save()
+        if cache.get_cache_dir() is not None:
+            cache.fingerprint(self)
+        if self.chunksize:
+            self.process_chunks()
+            logger.info('Done processing {}'.format(self.name))
+            return
+        if not self.run_stage('load_cached'):
+            self.run_stage('load')
+            self.run_stage('clean_all_fields')
+            self.run_filter()
+            self.run_stage('check_unique')
+            self.run_stage('join_all_tables')
+            self.run_stage('do_validate')
+            cache.store_cached(self)
+        if self.incremental:
+            self.run_stage('apply_delta')
+        self.run_stage('save')
+        if self.incremental:
+            self.save_snapshot()
         logger.info('Done processing {}'.format(self.name))
 
+    def run_stage(self, stage, *args, **kwargs):
+        """Run a method, recording it in the stats if they're enabled.
+        """
+        with measure(self, stage):
+            return getattr(self, stage)(*args, **kwargs)
+
+    def load_cached(self):
+        """Use the processed data from the on-disk cache if it's current.
+        """
+        data = cache.load_cached(self)
+        if data is None:
+            return False
+        self.data = data
+        if not getattr(self, 'fields', None):
+            self.fields = dict([(f, {}) for f in self.data.columns])
+        for name in ('load', 'clean_all_fields', 'filter', 'join_all_tables', 'do_validate'):
+            setattr(self, '_run_once_' + name, True)
+        return True
+
+    def process_chunks(self):
+        """Stream the source through the pipeline `chunksize` rows at a time.
+
+        Each chunk is cleaned, filtered, joined, validated and appended to
+        the outputs, so only one chunk is held in memory at once. Joins
+        broadcast the (fully loaded) right-hand table against each chunk;
+        joins needing the whole of this table are rejected.
+        """
+        self.check_streamable()
+        self._unique_seen = {}
+        for ii, chunk in enumerate(self.iter_chunks()):
+            logger.info('Processing {} chunk {}'.format(self.name, ii))
+            self.data = chunk
+            if not getattr(self, 'fields', None):
+                self.fields = dict([(f, {}) for f in chunk.columns])
+            for name in ('clean_all_fields', 'filter', 'join_all_tables', 'do_validate'):
+                setattr(self, '_run_once_' + name, False)
+            self.run_stage('clean_all_fields')
+            self.run_filter()
+            self.run_stage('check_unique')
+            self.run_stage('join_all_tables')
+            self.run_stage('do_validate')
+            self.run_stage('save', append=ii > 0)
+        self._unique_seen = None
+        self._run_once_load = True
+
+    def check_streamable(self):
+        for path, info in getattr(self, 'output', {}).items():
+            if info.get('type', None) != 'model' and get_format(path, info.get('format')) in COLUMNAR:
+                raise Exception('Cannot stream {}: output "{}" is columnar'.format(self.name, path))
+        for name, info in self.joins.items():
+            if info and info.get('how', 'inner') in ('right', 'outer'):
+                raise Exception('Cannot stream {}: "{}" join with {} needs the whole table'.format(
+                    self.name, info['how'], name
+                ))
+            right = get_table(name)
+            if getattr(right, 'chunksize', None):
+                raise Exception('Cannot stream {}: joined table {} is also streamed'.format(
+                    self.name, name
+                ))
+
     @run_once
     def load(self):
         if not hasattr(self, 'source_type'):
             self.resolve_source()
+        path, tbl = self.get_source()
+        if tbl is not None:
+            if getattr(tbl, 'chunksize', None):
+                raise Exception('Cannot use streamed table "{}" as a source'.format(tbl.name))
+            df = tbl.data
+            if getattr(self, 'fields', None):
+                df = df[list(self.fields.keys())]
+            if self.share_source and copy_on_write_enabled():
+                self.data = df.copy(deep=False)
+            else:
+                if self.share_source:
+                    logger.warning('Copy-on-write is not enabled, copying source of {}'.format(self.name))
+                self.data = df.copy()
+        elif self.plan_dtypes and isinstance(path, six.string_types):
+            self.load_planned(path)
+        else:
+            self.data = read_frame(
+                path, self.source_format, workers=self.read_workers, **self.get_read_options()
+            )
+
+        # If we have no fields then populate a list.
+        if not getattr(self, 'fields', None):
+            self.fields = dict([(f, {}) for f in self.data.columns])
+
+    def load_planned(self, path):
+        """Load the source using dtypes planned from a sample of it.
+
+        Low-cardinality string columns are read as categoricals and, if
+        `downcast_integers` or `downcast_floats` are set, numeric columns
+        are downcast. Fields with an explicit `type`, or
+        with `plan` set to False, are left alone. The per-column memory
+        saving is stored in `memory_report`.
+        """
+        options = self.get_read_options()
+        fmt = get_format(path, self.source_format)
+        if fmt == 'csv':
+            sample = read_frame(path, fmt, nrows=self.dtype_sample_rows, **options)
+        else:
+            sample = read_frame(path, fmt, **options).head(self.dtype_sample_rows)
+        fields = getattr(self, 'fields', None) or {}
+        exclude = set([
+            n for n, i in fields.items() if 'type' in i or not i.get('plan', True)
+        ])
+        plan = plan_categories(sample, self.category_ratio, exclude)
+        logger.info('Planned dtypes for {}: {}'.format(self.name, plan))
+        if fmt == 'csv':
+            options['dtype'] = dict(options.get('dtype', {}), **plan)
+            self.data = read_frame(path, fmt, workers=self.read_workers, **options)
+        else:
+            self.data = read_frame(path, fmt, **options)
+            for name, dtype in plan.items():
+                self.data[name] = self.data[name].astype(dtype)
+        downcast(
+            self.data, self.downcast_floats, exclude, self.downcast_unsigned,
+            self.downcast_integers
+        )
+        rows = float(max(len(sample), 1))
+        before = sample.memory_usage(index=False, deep=True) / rows * len(self.data)
+        after = self.data.memory_usage(index=False, deep=True)
+        self.memory_report = memory_report(before, after)
+        logger.info('Memory for {} (bytes):\n{}'.format(self.name, self.memory_report))
+
+    def memory_sharing(self):
+        """Report the bytes of each column and how many are shared with
+        the source table.
+        """
+        path, tbl = self.get_source()
+        usage = self.data.memory_usage(index=False, deep=True)
+        shared = pd.Series(0, index=usage.index)
+        if tbl is not None:
+            for name in self.data.columns:
+                if name in tbl.data:
+                    shared[name] = shared_bytes(self.data[name], tbl.data[name])
+        return pd.DataFrame({'bytes': usage, 'shared': shared})
+
+    def get_source(self):
+        """Return the source path and source table (if any).
+        """
+        tbl = None
         if isinstance(self.source, six.string_types):
 
             # Prefix with a specified root value, if given.
@@ -118,37 +313,42 @@ class Table(object):
         else:
             path = self.source
 
-        if tbl is not None:
-            df = tbl.data
-            if getattr(self, 'fields', None):
-                df = df[list(self.fields.keys())]
-            self.data = df.copy()
-        else:
-            extra = {}
-            if getattr(self, 'fields', None):
-
-                # Produce a mapping of types.
-                dtypes = {}
-                parse_dates = []
-                for name, info in self.fields.items():
-                    type = info.get('type', None)
-                    if type == date:
-                        parse_dates.append(name)
-                    if type is not None:
-                        dtypes[name] = type
-                if dtypes:
-                    extra['dtype'] = dtypes
-                if parse_dates:
-                    extra['parse_dates'] = parse_dates
-
-                # Maybe use all fields.
-                extra['usecols'] = self.fields.keys()
-
-            self.data = pd.read_csv(path, header=0, **extra)
+        return path, tbl
 
-        # If we have no fields then populate a list.
-        if not getattr(self, 'fields', None):
-            self.fields = dict([(f, {}) for f in self.data.columns])
+    def get_read_options(self):
+        """Build the extra `read_csv` arguments from `fields`.
+        """
+        extra = {}
+        if getattr(self, 'fields', None):
+
+            # Produce a mapping of types.
+            dtypes = {}
+            parse_dates = []
+            for name, info in self.fields.items():
+                type = info.get('type', None)
+                if type == date:
+                    parse_dates.append(name)
+                if type is not None:
+                    dtypes[name] = type
+            if dtypes:
+                extra['dtype'] = dtypes
+            if parse_dates:
+                extra['parse_dates'] = parse_dates
+
+            # Maybe use all fields.
+            extra['usecols'] = self.fields.keys()
+
+        return extra
+
+    def iter_chunks(self):
+        """Read the source file `chunksize` rows at a time.
+        """
+        path, tbl = self.get_source()
+        if tbl is not None:
+            raise Exception('Streaming is only supported for file sources: {}'.format(self.name))
+        reader = iter_frames(path, self.chunksize, self.source_format, **self.get_read_options())
+        for chunk in reader:
+            yield chunk
 
     @classmethod
     def get(cls):
@@ -160,7 +360,8 @@ class Table(object):
             self.data = self.data[list(self.fields.keys())]
         for name, info in self.fields.items():
             func = getattr(self, 'clean_' + name, self.clean_field)
-            func(name, info)
+            with measure(self, 'clean_' + name):
+                func(name, info)
 
     def clean_field(self, name, info):
         if 'type' in info:
@@ -179,7 +380,7 @@ class Table(object):
             # Set the final value.
             self.data[name] = new_col
         logger.info('Cleaning field {}."{}"'.format(self.name, name))
-        self.data[name] = self.data[name].map(clean_string)
+        self.data[name] = clean_series(self.data[name])
         if 'rename' in info:
             self.rename_field(name, info['rename'])
 
@@ -196,10 +397,19 @@ class Table(object):
     def drop_field(self, name):
         self.data.drop(name, axis=1, inplace=True)
 
-    def drop_empty(self, name):
-        # self.data = self.data[self.data.apply(lambda x: not is_empty(x[name]), axis=1)]
-        self.data = self.data[self.data[name].notnull()]
-        self.data = self.data[self.data.apply(lambda x: x[name] != '', axis=1)]
+    def empty_mask(self, *names, how='any'):
+        """Mask rows where any (or all) of the named columns are null or ''.
+        """
+        df = self.data[list(names)]
+        empty = df.isnull() | df.astype(object).eq('')
+        if how == 'any':
+            return empty.any(axis=1)
+        elif how == 'all':
+            return empty.all(axis=1)
+        raise Exception('Invalid value for how: "{}"'.format(how))
+
+    def drop_empty(self, *names, how='any'):
+        self.data = self.data[~self.empty_mask(*names, how=how)]
 
     def has_duplicates(self, *fields):
         dups = self.data.duplicated(subset=fields)
@@ -207,26 +417,120 @@ class Table(object):
         return not dups.empty
 
     def check_unique(self):
+        """Assert the `unique` fields have no duplicates.
+
+        When streaming, keys are also checked against earlier chunks using
+        a sorted array of 64-bit key hashes. That takes 8 bytes per row,
+        so it is the one part of a streamed table that grows with the file;
+        leave `unique` unset to stream without it.
+        """
+        seen = getattr(self, '_unique_seen', None)
         for fields in getattr(self, 'unique', []):
             if isinstance(fields, six.string_types):
                 fields = [fields]
             assert not self.has_duplicates(*fields), '{} has duplicate values in field(s) {}'.format(self.name, fields)
 
+            # When streaming, also check against keys from earlier chunks.
+            if seen is not None:
+                hashes = np.sort(pd.util.hash_pandas_object(self.data[fields], index=False).to_numpy())
+                prev = seen.get(tuple(fields), np.empty(0, dtype=np.uint64))
+                pos = np.searchsorted(prev, hashes)
+                found = pos.clip(max=max(len(prev) - 1, 0))
+                assert not (len(prev) and (prev[found] == hashes).any()), \
+                    '{} has duplicate values in field(s) {}'.format(self.name, fields)
+
+                # Merge the sorted chunk in rather than sorting everything again.
+                seen[tuple(fields)] = np.insert(prev, pos, hashes)
+
+    def get_snapshot_path(self):
+        base = get_config('snapshot_dir', None) or self.out_root or '.'
+        return os.path.join(base, '{}.snapshot.pkl'.format(self.name))
+
+    def apply_delta(self):
+        """Find the rows inserted or updated since the last run.
+
+        Rows are compared by a hash of their values after joining, so
+        changes in joined tables count, keyed on the first `unique` spec. `data` keeps every row, for dependent tables
+        and file outputs, while `changed` gives just the changed rows, for
+        model outputs. Keys that have disappeared are stored in `deleted`.
+        The new snapshot is written by `save_snapshot` once the table has
+        been saved, unless model output was skipped.
+        """
+        if not getattr(self, 'unique', None):
+            raise Exception('Incremental table {} needs a "unique" key'.format(self.name))
+        key = to_list(self.unique[0])
+        current = self.data[key].copy()
+        current['__hash__'] = pd.util.hash_pandas_object(self.data, index=False).values
+        self._snapshot = current
+
+        path = self.get_snapshot_path()
+        if os.path.exists(path):
+            prev = pd.read_pickle(path)
+        else:
+            prev = current.iloc[:0]
+        changed = current.merge(prev, on=key + ['__hash__'], how='left', indicator=True)
+        changed = (changed['_merge'] == 'left_only').values
+        inserted = current[key].merge(prev[key], on=key, how='left', indicator=True)
+        inserted = (inserted['_merge'] == 'left_only').values
+        deleted = prev[key].merge(current[key], on=key, how='left', indicator=True)
+        self.deleted = prev[key][(deleted['_merge'] == 'left_only').values]
+        self.delta = {
+            'inserted': int(inserted.sum()),
+            'updated': int((changed & ~inserted).sum()),
+            'deleted': len(self.deleted),
+        }
+        logger.info('Delta for {}: {inserted} inserted, {updated} updated, {deleted} deleted'.format(
+            self.name, **self.delta
+        ))
+        self._changed_keys = current[key][changed]
+
+    @property
+    def changed(self):
+        """The rows of `data` changed since the last run, or all of them
+        if the table isn't incremental.
+        """
+        keys = getattr(self, '_changed_keys', None)
+        if keys is None:
+            return self.data
+        key = list(keys.columns)
+        mask = pd.MultiIndex.from_frame(self.data[key]).isin(pd.MultiIndex.from_frame(keys))
+        return self.data[mask]
+
+    def save_snapshot(self):
+        if getattr(self, '_models_skipped', False):
+            logger.info('Model output skipped, keeping the snapshot of {}'.format(self.name))
+            return
+        path = self.get_snapshot_path()
+        base = os.path.dirname(path)
+        if base and not os.path.exists(base):
+            os.makedirs(base)
+        self._snapshot.to_pickle(path)
+
     @run_once
     def join_all_tables(self):
         for name, info in self.joins.items():
             func = getattr(self, 'join_' + name, self.join_table)
-            func(name, info)
+            with measure(self, 'join_' + name):
+                func(name, info)
 
     def join_table(self, name, info, inplace=True):
         if not info:
             return
         right = get_table(name)
+        if getattr(right, 'chunksize', None):
+            raise Exception('Cannot join with streamed table "{}"'.format(right.name))
+        info = dict(info)
+        max_fanout = self.get_threshold('max_fanout', info)
+        action = self.get_threshold('cardinality_action', info)
         cols_to_use, join_cols, rename_cols = self._get_cols_to_use(right, info)
         logger.info('Joining tables {} and {} on "{}"'.format(
             self.name, name, join_cols
         ))            
-        result = self.data.merge(right.data[cols_to_use], **info)
+        indexer = self._join_indexer(right, info)
+        stats = self.check_join(right, info, max_fanout, action, indexer)
+        result = self._join_gather(right, cols_to_use, info, indexer)
+        if result is None:
+            result = self.data.merge(right.data[cols_to_use], **info)
         if rename_cols:
             result.rename(columns=rename_cols, inplace=True)
         for col in join_cols:
@@ -234,17 +538,152 @@ class Table(object):
                 name = col + suf
                 if name in result:
                     result.drop(name, axis=1, inplace=True)
+        if stats is not None:
+            stats['rows_out'] = len(result)
         if inplace:
             self.data = result
         return result
 
+    def get_threshold(self, name, info=None):
+        """Get a cardinality threshold from join `info`, the table or the
+        config, in that order. `info` has the setting removed.
+        """
+        value = info.pop(name, None) if info is not None else None
+        if value is None:
+            value = getattr(self, name, None)
+        if value is None:
+            value = get_config(name, None)
+        return value
+
+    def check_join(self, right, info, max_fanout=None, action=None, indexer=None):
+        """Record the cardinality of a join before running it.
+
+        Raises an exception, or warns if `action` is "warn", when the join
+        would give more than `max_fanout` rows per row of this table.
+        `indexer` reuses the row positions found for `_join_gather`.
+        """
+        if 'on' in info:
+            left_on = right_on = to_list(info['on'])
+        elif 'left_on' in info and 'right_on' in info:
+            left_on, right_on = to_list(info['left_on']), to_list(info['right_on'])
+        else:
+            return None
+        stats = join_cardinality(
+            self.data, right.data, left_on, right_on, info.get('how', 'inner'), indexer
+        )
+        stats['stage'] = 'join_' + str(getattr(right, 'name', None))
+        stats['estimated_rows'] = stats['rows_out']
+        self.add_cardinality(stats)
+        logger.info('Join {} with {}: {} -> {} rows, {:.1%} matched, unique keys {}/{}'.format(
+            self.name, getattr(right, 'name', None), stats['rows_left'], stats['rows_out'],
+            stats['match_rate'], stats['left_unique'], stats['right_unique']
+        ))
+        if max_fanout is not None and stats['fanout'] > max_fanout:
+            msg = 'Join of {} with {} on {} would give {} rows from {} (fanout {:.2f} > {})'.format(
+                self.name, getattr(right, 'name', None), right_on, stats['rows_out'],
+                stats['rows_left'], stats['fanout'], max_fanout
+            )
+            if action == 'warn':
+                logger.warning(msg)
+            else:
+                raise Exception(msg)
+        return stats
+
+    def run_filter(self):
+        """Run `filter`, recording how many rows it keeps.
+
+        Raises an exception, or warns if `cardinality_action` is "warn",
+        when fewer than `min_selectivity` of the rows are kept.
+        """
+        if getattr(self, '_run_once_filter', False):
+            return
+        with measure(self, 'filter'):
+            rows_in = len(self.data)
+            self.filter()
+            rows_out = len(self.data)
+            stats = {
+                'stage': 'filter',
+                'rows_in': rows_in,
+                'rows_out': rows_out,
+                'selectivity': rows_out / float(rows_in) if rows_in else 1.0,
+            }
+            self.add_cardinality(stats)
+        min_selectivity = self.get_threshold('min_selectivity')
+        if min_selectivity is not None and stats['selectivity'] < min_selectivity:
+            msg = 'Filter of {} kept {} of {} rows ({:.1%} < {:.1%})'.format(
+                self.name, rows_out, rows_in, stats['selectivity'], min_selectivity
+            )
+            if self.get_threshold('cardinality_action') == 'warn':
+                logger.warning(msg)
+            else:
+                raise Exception(msg)
+
+    def add_cardinality(self, stats):
+        if getattr(self, 'cardinality', None) is None:
+            self.cardinality = []
+        self.cardinality.append(stats)
+        annotate(self, **dict([(k, v) for k, v in stats.items() if k != 'stage']))
+
+    def _join_indexer(self, right, info):
+        """Positions of the right table's rows matching each row, for joins
+        `_join_gather` can handle, or None.
+        """
+        if set(info.keys()) - set(['on', 'how']) or 'on' not in info:
+            return None
+        if info.get('how', 'inner') not in ('left', 'inner'):
+            return None
+        return get_key_indexer(self.data, right.data, to_list(info['on']))
+
+    def _join_gather(self, right, cols_to_use, info, indexer=None):
+        """Join by gathering rows from the right table's key index.
+
+        Only handles left and inner joins using `on` against unique right
+        keys, and returns None otherwise. The result matches `merge`,
+        including the suffixes of overlapping columns.
+        """
+        if indexer is None:
+            indexer = self._join_indexer(right, info)
+        if indexer is None:
+            return None
+        how = info.get('how', 'inner')
+        on = to_list(info['on'])
+        left = self.data
+        if how == 'inner':
+            keep = indexer >= 0
+            left = left[keep]
+            indexer = indexer[keep]
+        left = left.reset_index(drop=True)
+        gathered = OrderedDict()
+        overlap = {}
+        for col in cols_to_use:
+            if col in on:
+                continue
+            if col in left:
+                overlap[col] = col + '_x'
+                out = col + '_y'
+            else:
+                out = col
+            gathered[out] = right.data[col].array.take(indexer, allow_fill=True)
+        left = left.rename(columns=overlap)
+        if not gathered:
+            return left
+        return pd.concat([left, pd.DataFrame(gathered, index=left.index)], axis=1)
+
+    def index_on(self, key):
+        """Get a hash index of `data` on the key column(s).
+
+        Built once per key and rebuilt when `data` or its key columns
+        are replaced.
+        """
+        return get_key_index(self.data, key)
+
     def _get_cols_to_use(self, right, info):
         cols_to_use = right.data.columns.difference(self.data.columns)
         if 'on' in info:
             join_cols = info['on']
             if not isinstance(join_cols, (list, tuple)):
                 join_cols = [join_cols]
-            cols_to_use = cols_to_use.append(pd.Series(join_cols))
+            cols_to_use = cols_to_use.append(pd.Index(join_cols))
         else:
             join_cols = []
             if 'left_on' in info:
@@ -255,14 +694,14 @@ class Table(object):
             if 'right_on' in info:
                 if isinstance(info['right_on'], (list, tuple)):
                     join_cols.extend(info['right_on'])
-                    cols_to_use = cols_to_use.append(pd.Series(info['right_on']))
+                    cols_to_use = cols_to_use.append(pd.Index(info['right_on']))
                 else:
                     join_cols.append(info['right_on'])
-                    cols_to_use = cols_to_use.append(pd.Series([info['right_on']]))
+                    cols_to_use = cols_to_use.append(pd.Index([info['right_on']]))
         fields = info.pop('fields', None)
         cols_to_rename = {}
         if fields is not None:
-            cols_to_use = cols_to_use.append(pd.Series(list(fields.keys())))
+            cols_to_use = cols_to_use.append(pd.Index(list(fields.keys())))
             for name, field_info in fields.items():
                 if name in self.data:
                     if 'rename' not in field_info:
@@ -283,52 +722,101 @@ class Table(object):
         for table in getattr(self, 'joins', {}).keys():
             yield get_table(table)
 
+    def iter_dependencies(self):
+        """Iterate over tables that must be processed before this one.
+
+        Includes the source table, any joined tables and any tables
+        named in `depends` (for tables used by `condense`, `update_from`
+        and friends).
+        """
+        if isinstance(self.source, six.string_types):
+            tbl = get_table(self.source)
+            if tbl is not None:
+                yield tbl
+        for tbl in self.iter_join_tables():
+            if tbl is not None:
+                yield tbl
+        for name in to_list(self.depends):
+            yield get_table(name)
+
     def join_columns(self, *args, joiner=', '):
+        """Join the values of several columns, skipping falsy and null parts.
+        """
         df = self.data
-        return df.apply(lambda x: joiner.join([str(x[c]) for c in args if x[c] and not pd.isnull(x[c])]), axis=1)
+        result = pd.Series('', index=df.index, dtype=object)
+        started = pd.Series(False, index=df.index)
+        for c in args:
+            col = df[c].astype(object)
+            valid = col.notnull()
+            valid[valid] = col[valid].astype(bool)
+            text = col.where(valid, '').astype(str).astype(object)
+            result = result + np.where(started & valid, joiner, '') + text
+            started |= valid
+        return result
 
-    def condense(self, other, key, field):
+    def condense(self, other, key, field, func=None):
         """Join a set of values using groups.
+
+        `field` may be a list, in which case a DataFrame with one condensed
+        column per field is returned from a single grouping pass. `func`
+        overrides the default aggregation of joining the sorted values
+        with commas.
         """
         key = to_list(key)
+        fields = to_list(field)
         tbl = get_table(other)
         tbl.process()
-        df = tbl.data
-        grp = df.groupby(key)[field].apply(
-            lambda x: ','.join(x.sort_values())
-        )
-        return self.data[key].apply(
-            lambda x: grp.get(tuple([x[k] for k in key]), np.nan),
-            axis=1
-        )
+        if func is None:
+            func = lambda x: ','.join(x.sort_values())
+        grp = tbl.data.groupby(key)[fields].agg(func).reset_index()
+        result = self.data[key].merge(grp, on=key, how='left')
+        result.index = self.data.index
+        return result[field]
+
+    def _gather_from(self, other, key, columns):
+        """Gather `columns` of `other` aligned to the rows of `data` by key.
+
+        Rows without a match get missing values. Raises an exception if
+        `other` has duplicate keys, as there is no single row to use, and
+        a ValueError if the key dtypes can't be matched.
+        """
+        indexer = get_key_indexer(self.data, other.data, key)
+        if indexer is None:
+            raise Exception('Duplicate keys {} in table "{}"'.format(
+                key, getattr(other, 'name', None)
+            ))
+        return [(col, take_values(other.data[col], indexer)) for col in columns]
+
+    def _get_from_columns(self, other, key, columns):
+        """Get the key and the value columns present in both tables.
+        """
+        if columns is None:
+            columns = other.data.columns.values
+        key = to_list(key)
+        columns = [c for c in to_list(columns) if c not in key and c in self.data]
+        return key, columns
 
     def update_from(self, other, key, columns=None):
-        key = to_list(key)
+        """Overwrite `columns` with the non-missing values of the rows
+        in `other` with matching keys.
+        """
         other = get_table(other)
-        if columns is None:
-            columns = other.data.columns.values
-        columns = to_list(columns)
-        columns = list(set(columns) - set(key))
+        key, columns = self._get_from_columns(other, key, columns)
         da = self.data
-        db = other.data
-        values = da[key].merge(db[columns + key], on=key, how='left')
-        values.index = da.index  # SO IMPORTANT
-        da.update(values[columns])
+        for col, values in self._gather_from(other, key, columns):
+            assign_where(da, col, pd.notnull(values), values)
 
     def fillna_from(self, other, key, columns=None):
-        key = to_list(key)
+        """Fill missing values in `columns` from the rows in `other` with
+        matching keys.
+        """
         other = get_table(other)
-        if columns is None:
-            columns = other.data.columns.values
-        columns = to_list(columns)
-        columns = list(set(columns) - set(key))
+        key, columns = self._get_from_columns(other, key, columns)
         da = self.data
-        db = other.data
-        values = da[key].merge(db[columns + key], on=key, how='left')
-        values.index = da.index  # SO IMPORTANT
-        da.fillna(values[columns], inplace=True)
+        for col, values in self._gather_from(other, key, columns):
+            assign_where(da, col, pd.isnull(da[col]).to_numpy() & pd.notnull(values), values)
 
-    def save(self, path=None, **kwargs):
+    def save(self, path=None, append=False, **kwargs):
         if not path:
             path = self.out_root
             if path and path[-1] != '/':
@@ -344,6 +832,7 @@ class Table(object):
             base = None
             output = [(path, kwargs)]
         for path, info in output:
+            info = dict(info)
 
             # Check for a Django model.
             if info.get('type', None) == 'model':
@@ -362,10 +851,10 @@ class Table(object):
 
             if 'fields' in info:
                 info['columns'] = info.pop('fields')
-            df.to_csv(path, index=False, quoting=csv.QUOTE_MINIMAL, **info)
+            write_frame(df, path, info.pop('format', None), append, **info)
 
     def save_model(self, model_name, info):
-        df = self.data
+        df = self.changed
 
         # TODO: Can't do this due to FK fields.
         # # If unique has been given then apply it now.
@@ -373,7 +862,8 @@ class Table(object):
         # if unique is not None:
         #     df = df.drop_duplicates(unique)
 
-        save_model(self, df, model_name, info)
+        if not save_model(self, df, model_name, info):
+            self._models_skipped = True
 
     def save_temporary(self, df=None, path=None, append=False, **kwargs):
         if path is None:
@@ -388,25 +878,36 @@ class Table(object):
         return filename
 
     @classmethod
-    def autofill(cls, key, columns, lower=True, group_key='__group_key__'):
+    def autofill(cls, key, columns, lower=True):
+        """Fill nulls using the single non-null value of each group.
+
+        Groups with more than one distinct value are left alone, and are
+        returned (and logged) as a mapping of column to group values.
+        """
         logger.info('Autofilling values using key {}'.format(key))
         if isinstance(columns, six.string_types):
             columns = [columns]
         dd = cls.get().data
         if lower:
-            dd[group_key] = dd[key].map(str.lower)
+            group_key = dd[key].str.lower()
+        else:
+            group_key = dd[key]
         dd.replace('', np.nan, inplace=True)
-        gr = dd.groupby(group_key)
-        for name, group in gr:
-            for col in columns:
-                if group[col].count() and group[col].isnull().sum():
-                    values = group[col][group[col].notnull()]
-                    if len(values.unique()) == 1:
-                        logger.info('Filling {} with {} value(s) - {}'.format(
-                            col, len(group[col][group[col].isnull()]), name
-                        ))
-                        dd[col][dd[group_key] == name] = values.iloc[0]
-                    elif len(values.unique()) > 1:
-                        logger.warning('Inconsistent values for {}: {}'.format(
-                            name, values.unique()
-                        ))
+        grouped = dd.groupby(group_key)
+        report = {}
+        for col in columns:
+            nulls = dd[col].isnull()
+            has_nulls = nulls.groupby(group_key).transform('any').fillna(False).astype(bool)
+            nunique = grouped[col].transform('nunique')
+            fill = nulls & (nunique == 1)
+            if fill.any():
+                logger.info('Filling {} with {} value(s)'.format(col, fill.sum()))
+                first = grouped[col].transform('first')
+                dd.loc[fill, col] = first[fill]
+            bad = has_nulls & (nunique > 1)
+            if bad.any():
+                report[col] = dd.loc[bad, col].groupby(group_key[bad]).unique().to_dict()
+                logger.warning('Inconsistent values for {} in {} group(s): {}'.format(
+                    col, len(report[col]), report[col]
+                ))
+        return report
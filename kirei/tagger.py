@@ -1,8 +1,14 @@
 import re
+import six
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
 
 
 class Tagger(object):
     tag_exprs = {}
+    cache_size = 4096
 
     def __init__(self):
         self._progs = {}
@@ -11,6 +17,26 @@ class Tagger(object):
                 exprs = [exprs]
             all_expr = '(?<![a-z])(?:' + ')|(?:'.join(exprs) + ')(?![a-z])'
             self._progs[tag] = re.compile(all_expr, re.I)
+        self._compile_combined()
+        self._tag_cached = lru_cache(maxsize=self.cache_size)(self._tag_text_single_pass)
+
+    def _compile_combined(self):
+        """Combine all tag expressions into one zero-width alternation.
+
+        Scanning with the combined expression finds every position at
+        which some tag starts, in a single pass over the text.
+        """
+        self._group_tags = {}
+        alts = []
+        for ii, (tag, prog) in enumerate(self._progs.items()):
+            group = 't{}'.format(ii)
+            self._group_tags[group] = tag
+            alts.append('(?P<{}>{})'.format(group, prog.pattern))
+        try:
+            self._combined = re.compile('(?=' + '|'.join(alts) + ')', re.I) if alts else None
+        except re.error:
+            # Expressions with their own group references can't be combined.
+            self._combined = None
 
     def tag_text(self, text):
         tags = set()
@@ -19,6 +45,38 @@ class Tagger(object):
                 tags.add(tag)
         return tags
 
+    def _tag_text_single_pass(self, text):
+        if self._combined is None:
+            return frozenset(self.tag_text(text))
+        tags = set()
+        for match in self._combined.finditer(text):
+            tags.add(self._group_tags[match.lastgroup])
+
+            # Other tags may start at the same position.
+            pos = match.start()
+            for tag, prog in self._progs.items():
+                if tag not in tags and prog.match(text, pos):
+                    tags.add(tag)
+            if len(tags) == len(self._progs):
+                break
+        return frozenset(tags)
+
+    def tag_series(self, series):
+        """Tag every text in a Series, returning a Series of frozensets.
+
+        Each distinct text is tagged once, and results are memoized
+        across calls in a bounded LRU cache.
+        """
+        codes, uniques = pd.factorize(series)
+        results = np.empty(len(uniques) + 1, dtype=object)
+        for ii, text in enumerate(uniques):
+            if isinstance(text, six.string_types):
+                results[ii] = self._tag_cached(text)
+            else:
+                results[ii] = frozenset()
+        results[-1] = frozenset()
+        return pd.Series(results[codes], index=series.index)
+
     @property
     def tags(self):
         return self.tag_exprs.keys()
@@ -1,5 +1,6 @@
 import six
 import math
+import weakref
 
 import numpy as np
 import pandas as pd
@@ -36,3 +37,237 @@ def to_list(value):
 
 def to_set(value):
     return set(to_list(value))
+
+
+def copy_on_write_enabled():
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    try:
+        return bool(pd.get_option('mode.copy_on_write'))
+    except Exception:
+        return False
+
+
+def get_buffers(series):
+    """Get the arrays or (address, size) pairs backing a Series.
+    """
+    arr = series.array
+    if hasattr(arr, '_pa_array'):
+        return [
+            (buf.address, buf.size)
+            for chunk in arr._pa_array.chunks
+            for buf in chunk.buffers() if buf is not None
+        ]
+    if isinstance(arr, pd.Categorical):
+        return [arr.codes]
+    for attr in ('_ndarray', '_data'):
+        values = getattr(arr, attr, None)
+        if isinstance(values, np.ndarray):
+            return [values]
+    return [np.asarray(arr)]
+
+
+def shared_bytes(series, other):
+    """Count the bytes of `series` that share memory with `other`.
+    """
+    total = 0
+    other_buffers = get_buffers(other)
+    for buf in get_buffers(series):
+        for obuf in other_buffers:
+            if isinstance(buf, tuple):
+                if buf == obuf:
+                    total += buf[1]
+                    break
+            elif isinstance(obuf, np.ndarray) and np.shares_memory(buf, obuf):
+                total += buf.nbytes
+                break
+    return total
+
+
+# Key indexes per DataFrame, dropped when the frame is garbage collected.
+_key_indexes = {}
+
+
+def buffer_signature(series):
+    sig = []
+    for buf in get_buffers(series):
+        if isinstance(buf, np.ndarray):
+            sig.append((buf.__array_interface__['data'][0], buf.nbytes))
+        else:
+            sig.append(buf)
+    return tuple(sig)
+
+
+def get_key_index(df, key):
+    """Get a hash index of the rows of `df` on the key column(s).
+
+    The index is built once per key and reused while the key columns
+    are backed by the same memory. The cache holds views of the key
+    columns, so under copy-on-write any edit to them copies the data and
+    so invalidates the index. Without copy-on-write the key values are
+    hashed on each call to catch in-place edits.
+    """
+    key = tuple(to_list(key))
+    indexes = _key_indexes.get(id(df))
+    if indexes is None:
+        indexes = {}
+        _key_indexes[id(df)] = indexes
+        weakref.finalize(df, _key_indexes.pop, id(df), None)
+    columns = [df[k] for k in key]
+    sig = tuple([buffer_signature(c) for c in columns])
+    digest = None
+    if not copy_on_write_enabled():
+        digest = int(pd.util.hash_pandas_object(df[list(key)], index=False).sum())
+    cached = indexes.get(key)
+    if cached is not None and cached[0] == sig and cached[1] == digest:
+        return cached[2]
+    if len(key) == 1:
+        index = pd.Index(columns[0])
+    else:
+        index = pd.MultiIndex.from_frame(df[list(key)])
+    indexes[key] = (sig, digest, index, columns)
+    return index
+
+
+def get_key_indexer(left, right, key, right_key=None):
+    """Positions of the rows of `right` matching each row of `left`.
+
+    Missing keys give -1. Returns None if `right` has duplicate keys.
+    """
+    key = to_list(key)
+    right_key = to_list(right_key or key)
+    index = get_key_index(right, right_key)
+    if not index.is_unique:
+        return None
+    if not keys_comparable(left, right, key, right_key):
+        return _merge_indexer(left, right, key, right_key)
+    if len(key) == 1:
+        return index.get_indexer(left[key[0]])
+    return index.get_indexer(pd.MultiIndex.from_frame(left[list(key)]))
+
+
+def keys_comparable(left, right, key, right_key=None):
+    """Whether the key columns of both frames can be matched by hashing.
+
+    Keys of the same dtype, numeric keys and string keys are; anything
+    else must be matched by `merge`, which knows which mixes are valid.
+    """
+    for lk, rk in zip(to_list(key), to_list(right_key or key)):
+        a, b = left[lk].dtype, right[rk].dtype
+        if a == b:
+            continue
+        if _is_number(a) and _is_number(b):
+            continue
+        if _is_text(a) and _is_text(b):
+            continue
+        return False
+    return True
+
+
+def _is_number(dtype):
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _is_text(dtype):
+    return dtype == object or pd.api.types.is_string_dtype(dtype)
+
+
+def _merge_indexer(left, right, key, right_key):
+    """Find the matching row positions with `merge`, raising as it does for
+    incompatible keys. The keys of `right` must be unique.
+    """
+    pos = '__pos'
+    while pos in key:
+        pos += '_'
+    lk = left[key].reset_index(drop=True)
+    rk = right[right_key].reset_index(drop=True)
+    rk.columns = key
+    rk[pos] = np.arange(len(rk))
+    merged = lk.merge(rk, on=key, how='left', sort=False)
+    return merged[pos].fillna(-1).to_numpy().astype(np.intp)
+
+
+def take_values(series, indexer):
+    """Gather values of `series` by position, with -1 giving a missing value.
+    """
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+    else:
+        values = series.array
+    return pd.api.extensions.take(values, indexer, allow_fill=True)
+
+
+def assign_where(df, col, mask, values):
+    """Replace the values of column `col` where `mask` is set.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return
+    current = df[col]
+    if isinstance(current.dtype, np.dtype) and isinstance(values, np.ndarray):
+        new = values[mask]
+        result = current.to_numpy(copy=True)
+        if not _casts_losslessly(new, result.dtype):
+            result = result.astype(np.result_type(result.dtype, new.dtype))
+        result[mask] = new
+        df[col] = result
+    else:
+        df[col] = current.where(~mask, pd.Series(values, index=df.index))
+
+
+def _casts_losslessly(values, dtype):
+    if values.dtype == dtype:
+        return True
+    try:
+        return bool(np.all(values.astype(dtype) == values))
+    except (TypeError, ValueError):
+        return False
+
+
+def join_cardinality(left, right, left_on, right_on=None, how='inner', indexer=None):
+    """Estimate the size of a join from the key index of the right side.
+
+    Returns the row counts of each side and of the result, whether the
+    keys of each side are unique, the fraction of left rows with a match
+    and the fanout (result rows per left row). `indexer` may give the
+    positions from `get_key_indexer` when already found, so the left keys
+    aren't hashed again; `left_unique` is then None, as the left keys
+    aren't indexed.
+    """
+    ri = get_key_index(right, right_on or left_on)
+    li = None
+    if ri.is_unique:
+        if indexer is None:
+            indexer = get_key_indexer(left, right, left_on, right_on)
+        matches = (indexer >= 0).astype(np.int64)
+    else:
+        li = _key_values(left, left_on)
+        counts = ri.value_counts(dropna=False)
+        pos = counts.index.get_indexer(li)
+        matches = np.where(pos >= 0, counts.to_numpy()[pos], 0)
+    matched = matches > 0
+    rows = int(matches.sum())
+    if how in ('left', 'outer'):
+        rows += int((~matched).sum())
+    if how in ('right', 'outer'):
+        if li is None:
+            li = _key_values(left, left_on)
+        rows += int((~ri.isin(li)).sum())
+    return {
+        'rows_left': len(left),
+        'rows_right': len(right),
+        'rows_out': rows,
+        'left_unique': bool(li.is_unique) if li is not None else None,
+        'right_unique': bool(ri.is_unique),
+        'match_rate': float(matched.mean()) if len(matched) else 1.0,
+        'fanout': rows / float(max(len(left), 1)),
+    }
+
+
+def _key_values(df, key):
+    """The key values of `df` as an index, without caching it.
+    """
+    key = to_list(key)
+    if len(key) == 1:
+        return pd.Index(df[key[0]])
+    return pd.MultiIndex.from_frame(df[key])
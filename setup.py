@@ -41,5 +41,8 @@ setup(
         'numpy',
         'pandas',
     ],
+    extras_require={
+        'columnar': ['pyarrow'],
+    },
     zip_safe=False,
 )
@@ -0,0 +1,55 @@
+import django
+from django.conf import settings
+
+
+if not settings.configured:
+    settings.configure(
+        DATABASES={
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': ':memory:',
+            },
+        },
+        INSTALLED_APPS=[],
+    )
+    django.setup()
+
+from django.db import connection, models
+
+
+class Parent(models.Model):
+    code = models.CharField(max_length=32, unique=True)
+    name = models.CharField(max_length=64, null=True)
+
+    class Meta:
+        app_label = 'tests'
+
+
+class Child(models.Model):
+    code = models.CharField(max_length=32, unique=True)
+    parent = models.ForeignKey(Parent, null=True, on_delete=models.CASCADE)
+
+    class Meta:
+        app_label = 'tests'
+
+
+class Event(models.Model):
+    code = models.CharField(max_length=32)
+    day = models.DateField()
+    count = models.IntegerField(null=True)
+
+    class Meta:
+        app_label = 'tests'
+        unique_together = ('code', 'day')
+
+
+def create_tables():
+    with connection.schema_editor() as editor:
+        for model in (Parent, Child, Event):
+            editor.create_model(model)
+
+
+def drop_tables():
+    with connection.schema_editor() as editor:
+        for model in (Event, Child, Parent):
+            editor.delete_model(model)
@@ -0,0 +1,40 @@
+import os
+import json
+from unittest import TestCase
+
+from benchmarks.suite import Env, BENCHMARKS, run, compare, get_meta
+from kirei import registry
+
+
+class BenchmarkSuiteTestCase(TestCase):
+    """Test the benchmark suite runs on a small source.
+    """
+    def setUp(self):
+        self.env = Env(200, width=4, cardinality=10, model_rows=20)
+
+    def tearDown(self):
+        self.env.close()
+
+    def test_run(self):
+        tables = dict(registry._all_tables)
+        results = run(self.env, repeat=1)
+        self.assertListEqual(list(results.keys()), list(BENCHMARKS.keys()))
+        self.assertDictEqual(dict(registry._all_tables), tables)
+        data = json.loads(json.dumps({'meta': get_meta(self.env, 1), 'results': results}))
+        self.assertEqual(data['meta']['params']['rows'], 200)
+
+    def test_compare(self):
+        old = {'results': {'a': {'min': 1.0}, 'b': {'min': 1.0}}}
+        new = {'results': {'a': {'min': 1.1}, 'b': {'min': 2.0}, 'c': {'min': 1.0}}}
+        self.assertDictEqual(dict(compare(old, new, 1.25)), {'b': 2.0})
+
+    def test_condense_isolated(self):
+        call = BENCHMARKS['condense'](self.env)
+        source = registry.get_table('Source')
+        try:
+            call()
+        finally:
+            registry._all_tables.pop('Source', None)
+            registry._all_tables.pop('Lookup', None)
+        self.assertFalse(getattr(source, '_run_once_do_validate', False))
+        self.assertFalse(os.path.exists(os.path.join(self.env.dir, 'out', 'output.csv')))
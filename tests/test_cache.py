@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from kirei import Table, set_config
+from kirei.cache import evict
+
+from .fixtures import *
+
+
+class CachedTable(Table):
+    pass
+
+
+class TableCacheTestCase(TestCase):
+    """Test the on-disk cache of processed tables.
+    """
+    def setUp(self):
+        self.file = gen_linear_csv()
+        self.cache_dir = tempfile.mkdtemp()
+        set_config('cache_dir', self.cache_dir)
+
+    def tearDown(self):
+        set_config('cache_dir', None)
+        shutil.rmtree(self.cache_dir)
+
+    def process(self):
+        table = CachedTable(source=self.file.name, load=False)
+        table.resolve_source()
+        table.process()
+        return table
+
+    def test_hit(self):
+        first = self.process()
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        second = self.process()
+        self.assertTrue(second._run_once_load)
+        self.assertListEqual(second.data.values.tolist(), first.data.values.tolist())
+
+    def test_source_changed(self):
+        self.process()
+        self.file.write(b'10,110,210,310\n')
+        self.file.flush()
+        os.utime(self.file.name, (0, 0))
+        table = self.process()
+        self.assertEqual(len(table.data), 11)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_evict(self):
+        for ii in range(3):
+            with open(os.path.join(self.cache_dir, str(ii)), 'wb') as file:
+                file.write(b'x' * 10)
+            os.utime(os.path.join(self.cache_dir, str(ii)), (ii, ii))
+        evict(self.cache_dir, 20)
+        self.assertListEqual(sorted(os.listdir(self.cache_dir)), ['1', '2'])
+
+    def test_evict_removed(self):
+        for ii in range(3):
+            with open(os.path.join(self.cache_dir, str(ii)), 'wb') as file:
+                file.write(b'x' * 10)
+        real_stat = os.stat
+
+        def stat(path, *args, **kwargs):
+            # Simulate another thread removing an entry during eviction.
+            if path.endswith('1'):
+                os.remove(path)
+            return real_stat(path, *args, **kwargs)
+
+        with patch('os.stat', stat):
+            evict(self.cache_dir, 10)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_disabled(self):
+        set_config('cache_dir', None)
+        table = self.process()
+        self.assertFalse(hasattr(table, '_fingerprint'))
@@ -0,0 +1,178 @@
+import os
+import csv
+import shutil
+import sqlite3
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from unittest import TestCase
+
+import pandas as pd
+import pyarrow.parquet as pq
+from kirei.extract import (
+    copy_table, copy_table_incremental, extract_tables, ExtractState, write_parquet,
+    iter_batches, get_arrow_type
+)
+
+
+class SourceMixin(object):
+    """Create a SQLite source database with two tables.
+    """
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.db = os.path.join(self.dir, 'source.db')
+        conn = self.connect()
+        for name in ('one', 'two'):
+            conn.execute('CREATE TABLE {} (id INTEGER, name TEXT, guid TEXT)'.format(name))
+            conn.executemany(
+                'INSERT INTO {} VALUES (?, ?, ?)'.format(name),
+                [(ii, 'a "quoted", name' if ii == 3 else None, 'x') for ii in range(25)]
+            )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def connect(self):
+        return sqlite3.connect(self.db, check_same_thread=False)
+
+    def read(self, path):
+        with open(path, newline='') as file:
+            return list(csv.reader(file))
+
+
+class ExtractTestCase(SourceMixin, TestCase):
+    """Test streaming tables out of a DB-API connection.
+    """
+    def test_copy_table(self):
+        conn = self.connect()
+        columns = [('ID', 'int'), ('Name', 'varchar'), ('Guid', 'uniqueidentifier')]
+        path = copy_table(conn, 'one', self.dir, columns, batch_size=10)
+        rows = self.read(path)
+        self.assertListEqual(rows[0], ['id', 'name', 'guid'])
+        self.assertEqual(len(rows), 26)
+        self.assertListEqual(rows[4], ['3', 'a "quoted", name', ''])
+        self.assertListEqual(rows[5], ['4', '', ''])
+
+    def test_parquet_late_values(self):
+        conn = self.connect()
+        conn.execute("UPDATE one SET name = CASE WHEN id >= 20 THEN 'late' ELSE NULL END")
+        conn.execute("UPDATE one SET guid = NULL")
+        conn.commit()
+        path = copy_table(conn, 'one', self.dir, batch_size=10, format='parquet')
+        df = pd.read_parquet(path)
+        self.assertEqual(len(df), 25)
+        self.assertListEqual(list(df['name'][18:22].fillna('')), ['', '', 'late', 'late'])
+        self.assertTrue(df['guid'].isnull().all())
+
+    def test_parquet_promote_nulls(self):
+        conn = self.connect()
+        conn.execute("UPDATE one SET name = CASE WHEN id >= 20 THEN id ELSE NULL END")
+        conn.commit()
+        path = os.path.join(self.dir, 'one.parquet')
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, name FROM one')
+        write_parquet(path, ['id', 'name'], iter_batches(cursor, 10), [None, None], max_pending=1)
+        df = pd.read_parquet(path)
+        self.assertListEqual(list(df['name'][19:21].fillna('')), ['', '20'])
+
+    def test_parquet_short_nulls(self):
+        path = os.path.join(self.dir, 'one.parquet')
+        write_parquet(path, ['id', 'name'], [[(1, None), (2, None)]], [None, None])
+        self.assertEqual(str(pq.read_schema(path).field('name').type), 'string')
+
+    def test_parquet_decimals(self):
+        path = os.path.join(self.dir, 'one.parquet')
+        batches = [[(Decimal('1.50'),)], [(Decimal('12345.75'),)]]
+        write_parquet(path, ['value'], iter(batches), [None])
+        self.assertListEqual(list(pd.read_parquet(path)['value']), [Decimal('1.50'), Decimal('12345.75')])
+        columns = [('value', 'decimal', 9, 10, 2)]
+        write_parquet(path, ['value'], iter(batches), ['decimal'], arrow_types=[get_arrow_type(columns[0])])
+        self.assertEqual(str(pq.read_schema(path).field('value').type), 'decimal128(10, 2)')
+
+    def test_parquet_column_types(self):
+        conn = self.connect()
+        conn.execute("UPDATE one SET name = NULL")
+        conn.commit()
+        columns = [('ID', 'int'), ('Name', 'varchar'), ('Guid', 'uniqueidentifier')]
+        path = copy_table(conn, 'one', self.dir, columns, batch_size=10, format='parquet')
+        schema = pq.read_schema(path)
+        self.assertEqual(str(schema.field('id').type), 'int32')
+        self.assertEqual(str(schema.field('name').type), 'string')
+
+    def test_extract_tables(self):
+        paths = extract_tables(
+            self.connect, ['one', 'two'], self.dir, max_workers=2, batch_size=7, columns=None
+        )
+        self.assertListEqual(sorted(paths.keys()), ['one', 'two'])
+        for path in paths.values():
+            rows = self.read(path)
+            self.assertEqual(len(rows), 26)
+            self.assertListEqual(rows[1], ['0', '', 'x'])
+
+
+class IncrementalExtractTestCase(SourceMixin, TestCase):
+    """Test extracting only rows newer than the last watermark.
+    """
+    def extract(self):
+        return extract_tables(
+            self.connect, ['one'], self.dir, max_workers=1, batch_size=10, columns=None,
+            watermarks={'one': 'id'}
+        )['one']
+
+    def insert(self, ids):
+        conn = self.connect()
+        conn.executemany('INSERT INTO one VALUES (?, ?, ?)', [(ii, None, 'y') for ii in ids])
+        conn.commit()
+        conn.close()
+
+    def test_incremental(self):
+        path = self.extract()
+        self.assertEqual(len(self.read(path)), 26)
+        self.insert([25, 26])
+        self.extract()
+        rows = self.read(path)
+        self.assertEqual(len(rows), 28)
+        self.assertListEqual(rows[-1], ['26', '', 'y'])
+        self.extract()
+        self.assertEqual(len(self.read(path)), 28)
+
+    def test_resume(self):
+        path = self.extract()
+
+        # Simulate rows written after the last checkpoint.
+        with open(path, 'a') as file:
+            file.write('"99","partial","z"\n')
+        self.insert([25])
+        self.extract()
+        rows = self.read(path)
+        self.assertEqual(len(rows), 27)
+        self.assertListEqual(rows[-1], ['25', '', 'y'])
+
+    def test_checkpoint_boundaries(self):
+        conn = self.connect()
+        conn.execute('UPDATE one SET id = 9 WHERE id BETWEEN 5 AND 14')
+        conn.commit()
+        conn.close()
+        state = ExtractState(os.path.join(self.dir, 'extract_state.json'))
+        checkpoints = []
+        set_state = state.set
+        state.set = lambda *args: checkpoints.append(args) or set_state(*args)
+        conn = self.connect()
+        path = copy_table_incremental(conn, 'one', 'id', state, self.dir, batch_size=10)
+        conn.close()
+        self.assertListEqual([c[1] for c in checkpoints], [4, 18, 23, 24])
+
+        # Resume from the first checkpoint, as if interrupted after it.
+        set_state(*checkpoints[0])
+        self.extract()
+        ids = [r[0] for r in self.read(path)[1:]]
+        self.assertListEqual(ids, sorted(ids, key=int))
+        self.assertEqual(len(ids), 25)
+
+    def test_state_types(self):
+        state = ExtractState(os.path.join(self.dir, 'state.json'))
+        for value in (Decimal('12.50'), date(2016, 1, 2), datetime(2016, 1, 2, 3, 4), b'\x00\x01', 7):
+            state.set('one', value, 10)
+            self.assertEqual(ExtractState(state.path).get('one'), (value, 10))
@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+from kirei.formats import find_boundaries, read_csv_parallel
+
+
+class ParallelCSVTestCase(TestCase):
+    """Test splitting and parsing CSV files in parallel.
+    """
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'source.csv')
+        pd.DataFrame({
+            'A': list(range(1000)),
+            'B': ['line\nbreak "{}"'.format(ii) if ii % 7 == 0 else 'x' for ii in range(1000)],
+            'C': ['NSW', 'VIC'] * 500,
+        }).to_csv(self.path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_boundaries(self):
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        offsets = find_boundaries(self.path, 8)
+        self.assertEqual(len(offsets), 7)
+        for offset in offsets:
+            self.assertEqual(data[offset - 1:offset], b'\n')
+            self.assertEqual(data[:offset].count(b'"') % 2, 0)
+
+    def test_read(self):
+        expected = pd.read_csv(self.path, dtype={'C': 'category'})
+        result = read_csv_parallel(self.path, 4, min_chunk_bytes=1000, dtype={'C': 'category'})
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_read_late_text(self):
+        pd.DataFrame({
+            'A': list(range(999)) + ['x'],
+            'B': [True, False] * 499 + [True, 1],
+        }).to_csv(self.path, index=False)
+        expected = pd.read_csv(self.path)
+        result = read_csv_parallel(self.path, 4, min_chunk_bytes=1000)
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertListEqual(sorted(set(type(v) for v in result['A'])), [str])
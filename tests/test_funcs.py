@@ -0,0 +1,29 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from kirei.funcs import clean_string, clean_series
+
+
+class CleanSeriesTestCase(TestCase):
+    """Test the vectorized `clean_series` matches `clean_string`.
+    """
+    def assertMatches(self, series):
+        expected = series.map(clean_string)
+        pd.testing.assert_series_equal(clean_series(series), expected)
+
+    def test_mixed(self):
+        self.assertMatches(pd.Series([u' a\xa0', 1, None, '', np.nan, '  ', 'b'], dtype=object))
+
+    def test_strings(self):
+        self.assertMatches(pd.Series([u'\xa0x\xa0', ' y', '']))
+
+    def test_numeric(self):
+        series = pd.Series([1.5, np.nan])
+        self.assertIs(clean_series(series), series)
+
+    def test_empty(self):
+        self.assertMatches(pd.Series([], dtype=object))
+
+    def test_categorical(self):
+        self.assertMatches(pd.Series(['a ', 'b', 'a '], dtype='category'))
@@ -0,0 +1,123 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from datetime import date
+
+import pandas as pd
+from kirei.model import save_model, FKCache
+
+from .models import Parent, Child, Event, create_tables, drop_tables
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class BulkSaveModelTestCase(TestCase):
+    """Test saving DataFrames to models with `bulk` enabled.
+    """
+    def setUp(self):
+        create_tables()
+        self.saved = []
+
+    def tearDown(self):
+        drop_tables()
+
+    def post_save_model(self, row, inst, created):
+        self.saved.append((row['code'], created))
+
+    def test_insert_and_update(self):
+        Parent.objects.create(code='a', name='old')
+        df = pd.DataFrame({'code': ['a', 'b', 'c'], 'name': ['A', 'B', 'C']})
+        save_model(self, df, Parent, {'unique': 'code', 'bulk': True, 'batch_size': 2})
+        self.assertListEqual(
+            list(Parent.objects.order_by('code').values_list('code', 'name')),
+            [('a', 'A'), ('b', 'B'), ('c', 'C')]
+        )
+        self.assertListEqual(self.saved, [('a', False), ('b', True), ('c', True)])
+
+    def test_duplicate_keys(self):
+        df = pd.DataFrame({'code': ['a', 'a'], 'name': ['A', 'B']})
+        save_model(self, df, Parent, {'unique': ['code'], 'bulk': True})
+        self.assertListEqual(
+            list(Parent.objects.values_list('code', 'name')), [('a', 'B')]
+        )
+
+    def test_foreign_keys(self):
+        parent = Parent.objects.create(code='p')
+        df = pd.DataFrame({'code': ['x', 'y'], 'parent_code': ['p', 'p']})
+        save_model(self, df, Child, {
+            'unique': 'code',
+            'bulk': True,
+            'include': ['code', 'parent'],
+            'fields': {
+                'parent': {'model': Parent, 'fields': {'parent_code': 'code'}},
+            },
+        })
+        self.assertEqual(Child.objects.filter(parent=parent).count(), 2)
+
+
+    def test_composite_dates(self):
+        Event.objects.create(code='e0', day=date(2016, 1, 1), count=0)
+        days = pd.date_range('2016-01-01', periods=1500)
+        df = pd.DataFrame({
+            'code': ['e{}'.format(ii) for ii in range(1500)],
+            'day': days,
+            'count': range(1, 1501),
+        })
+        save_model(self, df, Event, {'unique': ['code', 'day'], 'bulk': True})
+        self.assertEqual(Event.objects.count(), 1500)
+        self.assertEqual(Event.objects.get(code='e0').count, 1)
+        self.assertListEqual(self.saved[:2], [('e0', False), ('e1', True)])
+
+
+class FKCacheTestCase(TestCase):
+    """Test FK lookups are prefetched and cached.
+    """
+    def setUp(self):
+        create_tables()
+        for code in ('p', 'q'):
+            Parent.objects.create(code=code)
+        self.info = {
+            'unique': 'code',
+            'include': ['code', 'parent'],
+            'fields': {
+                'parent': {'model': Parent, 'fields': {'parent_code': 'code'}},
+            },
+        }
+
+    def tearDown(self):
+        drop_tables()
+
+    def test_prefetch(self):
+        df = pd.DataFrame({'code': ['w', 'x', 'y', 'z'], 'parent_code': ['p', 'q', 'p', 'q']})
+        cache = FKCache()
+        with CaptureQueriesContext(connection) as ctx:
+            cache.prefetch(df, self.info['fields'])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        for code in df['parent_code']:
+            self.assertEqual(cache.get(Parent, {'code': code}).code, code)
+        self.assertEqual(cache.hits, 4)
+        self.assertEqual(cache.misses, 0)
+
+    def test_prefetch_chunks(self):
+        df = pd.DataFrame({'code': ['w', 'x', 'y', 'z'], 'parent_code': ['p', 'q', 'p', 'r']})
+        cache = FKCache()
+        with patch('kirei.model.MAX_QUERY_PARAMS', 1):
+            with CaptureQueriesContext(connection) as ctx:
+                cache.prefetch(df, self.info['fields'])
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertEqual(cache.get(Parent, {'code': 'q'}).code, 'q')
+        self.assertEqual(cache.hits, 1)
+
+    def test_missing(self):
+        df = pd.DataFrame({'code': ['x'], 'parent_code': ['r']})
+        with self.assertRaises(Parent.DoesNotExist):
+            save_model(self, df, Child, self.info)
+
+    def test_save(self):
+        df = pd.DataFrame({'code': ['x', 'y'], 'parent_code': ['p', 'q']})
+        save_model(self, df, Child, self.info)
+        self.assertListEqual(
+            list(Child.objects.order_by('code').values_list('parent__code', flat=True)),
+            ['p', 'q']
+        )
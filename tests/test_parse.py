@@ -0,0 +1,53 @@
+import warnings
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from django.core.exceptions import ValidationError
+from kirei.parse import (
+    parse_date, parse_bool, parse_decimal, parse_duration,
+    parse_dates, parse_bools, parse_decimals, parse_durations
+)
+
+
+class ParseSeriesTestCase(TestCase):
+    """Test the Series parsers agree with the scalar parsers.
+    """
+    def test_dates(self):
+        values = ['2016-01-02', '2016-02-03', '5 Jan 2017']
+        result = parse_dates(pd.Series(values + [np.nan]))
+        self.assertListEqual(list(result[:3]), list(map(parse_date, values)))
+        self.assertTrue(pd.isnull(result[3]))
+
+    def test_dates_ambiguous(self):
+        values = ['13/01/2016', '02/03/2016', '01/12/2016', '01/02/70']
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            result = parse_dates(pd.Series(values))
+        self.assertListEqual(list(result), list(map(parse_date, values)))
+
+    def test_dates_errors(self):
+        with self.assertRaises(ValidationError) as ctx:
+            parse_dates(pd.Series(['2016-01-02', 'abc', '2016-01-03', 'xyz']))
+        self.assertEqual(len(ctx.exception.messages), 2)
+        self.assertIn('Row 3', ctx.exception.messages[1])
+
+    def test_bools(self):
+        values = ['Yes', 'no', 'T', 'F', 1, 0]
+        result = parse_bools(pd.Series(values, dtype=object))
+        self.assertListEqual(list(result), list(map(parse_bool, values)))
+
+    def test_decimals(self):
+        values = ['1.5', ' 2 ', '', '1.5']
+        result = parse_decimals(pd.Series(values))
+        self.assertListEqual(list(result), list(map(parse_decimal, values)))
+
+    def test_durations(self):
+        values = ['1d', '3 hours 30m', '5s', '2.5h']
+        result = parse_durations(pd.Series(values))
+        self.assertListEqual(list(result), list(map(parse_duration, values)))
+
+    def test_durations_errors(self):
+        result = parse_durations(pd.Series(['1d', 'junk', '']), error='ignore')
+        self.assertTrue(pd.isnull(result[1]))
+        self.assertTrue(pd.isnull(result[2]))
@@ -0,0 +1,85 @@
+import time
+import threading
+from unittest import TestCase
+
+from kirei import Table, registry
+
+from .fixtures import *
+
+
+class Left(Table):
+    pass
+
+
+class Right(Table):
+    pass
+
+
+class Derived(Table):
+    source = 'Left'
+    depends = ['Right']
+
+    def filter(self):
+        self.update_from('Right', key='A', columns='B')
+
+
+class RegistryScheduleTestCase(TestCase):
+    """Test dependency ordering and scheduling of tables.
+    """
+    def setUp(self):
+        self.files = [gen_linear_csv(), gen_linear_csv(1000)]
+        self.tables = {}
+        for cls in (Derived, Left, Right):
+            registry._all_tables[cls.__name__] = cls(load=False)
+            self.tables[cls.__name__] = registry._all_tables[cls.__name__]
+        self.tables['Left'].source = self.files[0].name
+        self.tables['Right'].source = self.files[1].name
+        for table in self.tables.values():
+            table.resolve_source()
+
+    def tearDown(self):
+        for name in self.tables:
+            registry._all_tables.pop(name, None)
+
+    def test_order(self):
+        ordered = [t.name for t in registry.order_tables(self.tables.values())]
+        self.assertLess(ordered.index('Left'), ordered.index('Derived'))
+        self.assertLess(ordered.index('Right'), ordered.index('Derived'))
+
+    def test_cycle(self):
+        self.tables['Left'].depends = ['Derived']
+        with self.assertRaises(Exception):
+            registry.order_tables(self.tables.values())
+
+    def test_process_parallel(self):
+        registry.process_tables(self.tables.values(), max_workers=2)
+        self.assertListEqual(
+            list(self.tables['Derived'].data['B']), list(range(1100, 1110)),
+            'B column should be right values'
+        )
+
+    def test_process_pool(self):
+        registry.process_tables(self.tables.values(), max_workers=2, executor='process')
+        self.assertListEqual(
+            list(self.tables['Derived'].data['B']), list(range(1100, 1110)),
+            'B column should be right values'
+        )
+        self.assertListEqual(
+            list(self.tables['Left'].data['B']), list(range(100, 110)),
+            'source table should be unchanged'
+        )
+
+    def test_process_waits(self):
+        table = self.tables['Right']
+        load = table.load
+
+        def slow_load():
+            time.sleep(0.2)
+            load()
+        table.load = slow_load
+        thread = threading.Thread(target=table.process)
+        thread.start()
+        time.sleep(0.05)
+        table.process()
+        self.assertListEqual(list(table.data['B']), list(range(1100, 1110)))
+        thread.join()
@@ -0,0 +1,47 @@
+import pickle
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from kirei.shared import share_frame, release, _bases
+
+
+class SharedFrameTestCase(TestCase):
+    """Test passing DataFrames through shared memory.
+    """
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'A': np.arange(10),
+            'B': np.arange(10) * 1.5,
+            'C': list('abcdefghij'),
+            'D': pd.Categorical(['x', 'y'] * 5),
+        })
+        self.handle = share_frame(self.df)
+
+    def tearDown(self):
+        self.handle.unlink()
+
+    def test_round_trip(self):
+        handle = pickle.loads(pickle.dumps(self.handle))
+        pd.testing.assert_frame_equal(handle.attach(), self.df)
+        self.assertEqual(self.handle.nbytes, 10 * 8 * 2 + 10)
+
+    def test_copy_on_write(self):
+        df = self.handle.attach()
+        df.loc[0, 'A'] = 99
+        self.assertEqual(self.handle.attach().loc[0, 'A'], 0)
+
+    def test_unlink_unmaps(self):
+        names = list(self.handle.names)
+        self.handle.unlink()
+        with open('/proc/self/maps') as file:
+            maps = file.read()
+        for name in names:
+            self.assertNotIn(name, maps)
+        self.assertTrue(self.handle.unlinked)
+
+    def test_release(self):
+        handle = pickle.loads(pickle.dumps(self.handle))
+        handle.attach()
+        release()
+        self.assertListEqual(_bases, [])
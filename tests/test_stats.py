@@ -0,0 +1,71 @@
+import json
+from unittest import TestCase
+
+from kirei import Table, Stats, set_config, registry
+
+from .fixtures import *
+
+
+class Lookup(Table):
+    fields = {'A': {}, 'D': {}}
+
+
+class Stated(Table):
+    fields = {'A': {}, 'B': {}}
+    joins = {'Lookup': {'on': 'A', 'how': 'left'}}
+
+    def filter(self):
+        self.data = self.data[self.data['A'] < 5]
+
+
+class StatsTestCase(TestCase):
+    """Test recording stage statistics while processing tables.
+    """
+    def setUp(self):
+        self.files = [gen_linear_csv(), gen_linear_csv(1000)]
+        self.table = Stated(source=self.files[0].name, load=False)
+        self.lookup = Lookup(source=self.files[1].name, load=False)
+        registry._all_tables['Lookup'] = self.lookup
+        self.table.resolve_source()
+        self.lookup.resolve_source()
+        self.hooked = []
+        self.stats = Stats(memory=True, hooks=[self.hooked.append])
+        set_config('stats', self.stats)
+
+    def tearDown(self):
+        set_config('stats', None)
+        self.stats.close()
+        registry._all_tables.pop('Lookup', None)
+
+    def get(self, table, stage):
+        return [r for r in self.stats.records if r['table'] == table and r['stage'] == stage][0]
+
+    def test_records(self):
+        self.table.process()
+        stages = [r['stage'] for r in self.stats.records if r['table'] == 'Stated']
+        for stage in ('load', 'clean_A', 'clean_B', 'clean_all_fields', 'filter', 'join_Lookup', 'save'):
+            self.assertIn(stage, stages)
+        rec = self.get('Stated', 'filter')
+        self.assertEqual((rec['rows_in'], rec['rows_out']), (10, 5))
+        self.assertIsNone(rec['parent'])
+        self.assertEqual(self.get('Stated', 'clean_A')['parent'], 'clean_all_fields')
+        self.assertEqual(self.get('Stated', 'join_Lookup')['parent'], 'join_all_tables')
+        self.assertEqual(self.get('Stated', 'join_Lookup')['match_rate'], 1.0)
+        self.assertEqual(self.get('Stated', 'filter')['selectivity'], 0.5)
+        self.assertGreaterEqual(self.get('Stated', 'load')['mem_peak'], 0)
+        self.assertEqual(len(self.hooked), len(self.stats.records))
+
+    def test_export(self):
+        self.table.process()
+        data = json.loads(self.stats.to_json())
+        self.assertEqual(len(data['records']), len(self.stats.records))
+        self.assertSetEqual(set([t['table'] for t in data['totals']]), set(['Stated', 'Lookup']))
+        walls = [t['wall'] for t in data['totals']]
+        self.assertListEqual(walls, sorted(walls, reverse=True))
+        trace = json.loads(self.stats.to_chrome_trace())
+        event = trace['traceEvents'][0]
+        self.assertEqual(event['ph'], 'X')
+        self.assertEqual(event['name'], self.stats.records[0]['stage'])
+        lines = self.stats.summary().splitlines()
+        walls = [float(l.split()[2]) for l in lines[1:len(self.stats.records) + 1]]
+        self.assertListEqual(walls, sorted(walls, reverse=True))
@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from kirei import Table, registry
+
+
+class AutofillTable(Table):
+    name = 'AutofillTable'
+
+
+class TableAutofillTestCase(TestCase):
+    """Test the `autofill` method on `Table`s.
+    """
+    def setUp(self):
+        self.table = AutofillTable(load=False)
+        self.table.data = pd.DataFrame({
+            'K': ['a', 'A', 'b', 'b', 'c', 'c', 'c', np.nan],
+            'V': ['x', np.nan, 'y', '', 'z', 'w', np.nan, np.nan],
+        })
+        registry._all_tables[self.table.name] = self.table
+
+    def tearDown(self):
+        registry._all_tables.pop(self.table.name)
+
+    def test_fill(self):
+        report = AutofillTable.autofill('K', 'V')
+        self.assertListEqual(
+            list(self.table.data['V'].fillna('')), ['x', 'x', 'y', 'y', 'z', 'w', '', '']
+        )
+        self.assertListEqual(list(report['V'].keys()), ['c'])
+        self.assertListEqual(list(self.table.data.columns), ['K', 'V'])
+
+    def test_case_sensitive(self):
+        AutofillTable.autofill('K', 'V', lower=False)
+        self.assertTrue(pd.isnull(self.table.data['V'][1]))
@@ -0,0 +1,78 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from kirei import Table, set_config
+from kirei import utils
+from kirei.utils import join_cardinality
+
+
+class Filtered(Table):
+    fields = {'K': {}, 'V': {}}
+
+    def filter(self):
+        self.data = self.data[self.data['V'] > 3]
+
+
+class TableCardinalityTestCase(TestCase):
+    """Test cardinality stats and thresholds for joins and filters.
+    """
+    def setUp(self):
+        self.left = Table(load=False)
+        self.left.data = pd.DataFrame({'K': [1, 2, 2, 3, np.nan], 'V': [1, 2, 3, 4, 5]})
+        self.right = Table(load=False)
+        self.right.name = 'Right'
+        self.right.data = pd.DataFrame({'K': [2, 2, 2, 4, np.nan], 'R': list('abcde')})
+
+    def tearDown(self):
+        set_config('max_fanout', None)
+
+    def test_estimate(self):
+        for how in ('inner', 'left', 'right', 'outer'):
+            stats = join_cardinality(self.left.data, self.right.data, ['K'], how=how)
+            expected = self.left.data.merge(self.right.data, on='K', how=how)
+            self.assertEqual(stats['rows_out'], len(expected), how)
+        self.assertFalse(stats['right_unique'])
+        self.assertFalse(stats['left_unique'])
+        self.assertEqual(stats['match_rate'], 0.6)
+
+    def test_join_stats(self):
+        self.left.join_table(self.right, {'on': 'K', 'how': 'left'})
+        stats = self.left.cardinality[-1]
+        self.assertEqual(stats['stage'], 'join_Right')
+        self.assertEqual(stats['rows_left'], 5)
+        self.assertEqual(stats['rows_out'], 9)
+        self.assertEqual(stats['estimated_rows'], 9)
+
+    def test_join_indexes_once(self):
+        self.right.data = self.right.data.drop_duplicates('K')
+        left = self.left.data
+        with patch('kirei.table.get_key_indexer', wraps=utils.get_key_indexer) as table_indexer, \
+                patch('kirei.utils.get_key_indexer', wraps=utils.get_key_indexer) as utils_indexer:
+            self.left.join_table(self.right, {'on': 'K', 'how': 'left'})
+        self.assertEqual(table_indexer.call_count + utils_indexer.call_count, 1)
+        self.assertNotIn(id(left), utils._key_indexes)
+        self.assertEqual(self.left.cardinality[-1]['match_rate'], 0.6)
+
+    def test_max_fanout(self):
+        with self.assertRaises(Exception):
+            self.left.join_table(self.right, {'on': 'K', 'how': 'left', 'max_fanout': 1.5})
+        self.assertEqual(len(self.left.data), 5)
+        set_config('max_fanout', 1.5)
+        with self.assertRaises(Exception):
+            self.left.join_table(self.right, {'on': 'K', 'how': 'left'})
+        with self.assertLogs('kirei.table', 'WARNING'):
+            self.left.join_table(self.right, {'on': 'K', 'how': 'left', 'cardinality_action': 'warn'})
+        self.assertEqual(len(self.left.data), 9)
+
+    def test_filter(self):
+        table = Filtered(load=False)
+        table.data = self.left.data.copy()
+        table.run_filter()
+        self.assertEqual(table.cardinality[-1]['selectivity'], 0.4)
+        table = Filtered(load=False)
+        table.data = self.left.data.copy()
+        table.min_selectivity = 0.5
+        with self.assertRaises(Exception):
+            table.run_filter()
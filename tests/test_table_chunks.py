@@ -0,0 +1,65 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from kirei import Table
+
+from .fixtures import *
+
+
+class StreamedTable(Table):
+    chunksize = 3
+
+
+class TableChunksTestCase(TestCase):
+    """Test streaming tables through the pipeline in chunks.
+    """
+    def setUp(self):
+        self.file = gen_linear_csv()
+        self.out_dir = tempfile.mkdtemp()
+
+    def test_output_matches(self):
+        table = StreamedTable(source=self.file.name, load=False, out_root=self.out_dir)
+        table.output = {'out.csv': {}}
+        table.resolve_source()
+        table.process()
+        result = pd.read_csv(os.path.join(self.out_dir, 'out.csv'))
+        expected = pd.read_csv(self.file.name)
+        self.assertListEqual(
+            result.values.tolist(), expected.values.tolist(),
+            'streamed output differs from the source'
+        )
+
+    def test_unique_across_chunks(self):
+        self.file.write(b'0,1,2,3\n')
+        self.file.flush()
+        table = StreamedTable(source=self.file.name, load=False)
+        table.unique = ['A']
+        table.resolve_source()
+        with self.assertRaises(AssertionError):
+            table.process()
+
+    def test_unique_hashes(self):
+        table = StreamedTable(source=self.file.name, load=False)
+        table.unique = ['A', ['B', 'C']]
+        table.resolve_source()
+        seen = {}
+        check = table.check_unique
+
+        def check_unique():
+            check()
+            seen.update(table._unique_seen)
+        table.check_unique = check_unique
+        table.process()
+        self.assertEqual(seen[('A',)].dtype, np.uint64)
+        self.assertEqual(len(seen[('B', 'C')]), 10)
+        self.assertTrue((seen[('A',)][1:] > seen[('A',)][:-1]).all())
+
+    def test_reject_outer_join(self):
+        table = StreamedTable(source=self.file.name, load=False)
+        table.joins = {'Other': {'on': 'A', 'how': 'outer'}}
+        table.resolve_source()
+        with self.assertRaises(Exception):
+            table.process()
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+import pandas as pd
+from kirei import Table
+
+
+class TableCondenseTestCase(TestCase):
+    """Test the `condense` method on `Table`s.
+    """
+    def setUp(self):
+        self.table = Table(load=False)
+        self.table.data = pd.DataFrame({'K': ['a', 'b', 'c', 'a']})
+        self.other = Table(load=False)
+        self.other.data = pd.DataFrame({
+            'K': ['a', 'a', 'b', 'd'],
+            'V': ['z', 'y', 'x', 'w'],
+            'W': ['1', '2', '3', '4'],
+        })
+        self.other._run_once_process = True
+
+    def test_single_field(self):
+        result = self.table.condense(self.other, 'K', 'V')
+        self.assertListEqual(list(result.fillna('')), ['y,z', 'x', '', 'y,z'])
+
+    def test_multiple_fields(self):
+        result = self.table.condense(self.other, 'K', ['V', 'W'])
+        self.assertListEqual(list(result.columns), ['V', 'W'])
+        self.assertListEqual(list(result['W'].fillna('')), ['1,2', '3', '', '1,2'])
+
+    def test_custom_func(self):
+        result = self.table.condense(self.other, 'K', 'V', func='count')
+        self.assertListEqual(list(result.fillna(0)), [2, 1, 0, 2])
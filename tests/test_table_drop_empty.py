@@ -0,0 +1,28 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from kirei import Table
+
+
+class TableDropEmptyTestCase(TestCase):
+    """Test the `drop_empty` method on `Table`s.
+    """
+    def setUp(self):
+        self.table = Table(load=False)
+        self.table.data = pd.DataFrame({
+            'A': ['a', '', 'c', np.nan, 'e'],
+            'B': [1, 2, np.nan, np.nan, 5],
+        })
+
+    def test_single(self):
+        self.table.drop_empty('A')
+        self.assertListEqual(list(self.table.data['A']), ['a', 'c', 'e'])
+
+    def test_any(self):
+        self.table.drop_empty('A', 'B')
+        self.assertListEqual(list(self.table.data['A']), ['a', 'e'])
+
+    def test_all(self):
+        self.table.drop_empty('A', 'B', how='all')
+        self.assertListEqual(list(self.table.data['A']), ['a', '', 'c', 'e'])
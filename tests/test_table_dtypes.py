@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+from kirei import Table
+
+
+class PlannedTable(Table):
+    plan_dtypes = True
+    dtype_sample_rows = 50
+
+
+class TableDtypesTestCase(TestCase):
+    """Test planning dtypes when loading tables.
+    """
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'source.csv')
+        pd.DataFrame({
+            'state': ['NSW', 'VIC', 'QLD', 'WA'] * 50,
+            'name': ['name {}'.format(ii) for ii in range(200)],
+            'count': list(range(200)),
+            'value': [ii / 3.0 for ii in range(200)],
+        }).to_csv(self.path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_plan(self):
+        table = PlannedTable(source=self.path)
+        self.assertEqual(table.data['state'].dtype.name, 'category')
+        self.assertNotEqual(table.data['name'].dtype.name, 'category')
+        self.assertEqual(table.data['count'].dtype.name, 'int64')
+        self.assertEqual(table.data['value'].dtype.name, 'float64')
+        self.assertGreater(table.memory_report.loc['state', 'saved'], 0)
+
+    def test_field_options(self):
+        table = PlannedTable(source=self.path, fields={
+            'state': {'plan': False},
+            'count': {'type': 'int64'},
+        })
+        self.assertNotEqual(table.data['state'].dtype.name, 'category')
+        self.assertEqual(table.data['count'].dtype.name, 'int64')
+
+    def test_integers(self):
+        table = PlannedTable(source=self.path)
+        self.assertEqual((table.data['count'] * 1000).max(), 199000)
+        table = type('IntegerTable', (PlannedTable,), {'downcast_integers': True})(source=self.path)
+        self.assertEqual(table.data['count'].dtype.name, 'int16')
+        self.assertEqual((table.data['count'] - 1).min(), -1)
+        table = type('UnsignedTable', (PlannedTable,), {
+            'downcast_integers': True, 'downcast_unsigned': True,
+        })(source=self.path)
+        self.assertEqual(table.data['count'].dtype.name, 'uint8')
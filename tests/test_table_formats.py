@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+from kirei import Table
+
+
+class TableFormatsTestCase(TestCase):
+    """Test loading and saving columnar file formats.
+    """
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.df = pd.DataFrame({
+            'A': list(range(10)),
+            'B': [ii * 1.5 for ii in range(10)],
+            'C': pd.date_range('2016-01-01', periods=10),
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_load_parquet(self):
+        path = os.path.join(self.dir, 'source.parquet')
+        self.df.to_parquet(path)
+        table = Table(source=path, fields={'A': {}, 'C': {}})
+        self.assertListEqual(list(table.data.columns), ['A', 'C'])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(table.data['C']))
+
+    def test_load_feather_types(self):
+        path = os.path.join(self.dir, 'source.feather')
+        self.df.to_feather(path)
+        table = Table(source=path, fields={'A': {'type': float}})
+        self.assertEqual(table.data['A'].dtype, float)
+
+    def test_save(self):
+        table = Table(source=self.df, load=False)
+        table.data = self.df
+        for name in ('out.parquet', 'out.feather', 'out.dat'):
+            info = {'format': 'parquet'} if name == 'out.dat' else {}
+            table.save(os.path.join(self.dir, name), **info)
+        pd.testing.assert_frame_equal(pd.read_parquet(os.path.join(self.dir, 'out.parquet')), self.df)
+        pd.testing.assert_frame_equal(pd.read_feather(os.path.join(self.dir, 'out.feather')), self.df)
+        pd.testing.assert_frame_equal(pd.read_parquet(os.path.join(self.dir, 'out.dat')), self.df)
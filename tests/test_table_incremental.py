@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+from kirei import Table, set_config, registry
+
+from .fixtures import *
+
+
+class IncrementalTable(Table):
+    incremental = True
+    unique = ['A']
+
+
+class TableIncrementalTestCase(TestCase):
+    """Test processing only the rows changed since the last run.
+    """
+    def setUp(self):
+        self.snapshot_dir = tempfile.mkdtemp()
+        set_config('snapshot_dir', self.snapshot_dir)
+
+    def tearDown(self):
+        set_config('snapshot_dir', None)
+        shutil.rmtree(self.snapshot_dir)
+
+    def process(self, file, out_root=None):
+        table = IncrementalTable(source=file.name, load=False, out_root=out_root)
+        table.resolve_source()
+        table.process()
+        return table
+
+    def test_first_run(self):
+        table = self.process(gen_linear_csv())
+        self.assertEqual(len(table.changed), 10)
+        self.assertEqual(table.delta, {'inserted': 10, 'updated': 0, 'deleted': 0})
+
+    def test_unchanged(self):
+        self.process(gen_linear_csv())
+        table = self.process(gen_linear_csv())
+        self.assertTrue(table.changed.empty)
+        self.assertEqual(len(table.data), 10)
+
+    def test_changes(self):
+        self.process(gen_linear_csv())
+        file = gen_empty_csv()
+        for ii in range(1, 11):
+            base = 1000 if ii == 5 else 0
+            file.write(','.join(map(str, [ii, base + 100 + ii, 200 + ii, 300 + ii])).encode('utf8') + b'\n')
+        file.flush()
+        table = self.process(file)
+        self.assertEqual(table.delta, {'inserted': 1, 'updated': 1, 'deleted': 1})
+        self.assertListEqual(list(table.changed['A']), [5, 10])
+        self.assertEqual(len(table.data), 10)
+        self.assertListEqual(list(table.deleted['A']), [0])
+
+    def test_output_has_all_rows(self):
+        IncrementalTable.output = {'out.csv': {}}
+        try:
+            self.process(gen_linear_csv(), self.snapshot_dir)
+            self.process(gen_linear_csv(), self.snapshot_dir)
+        finally:
+            del IncrementalTable.output
+        with open(os.path.join(self.snapshot_dir, 'out.csv')) as file:
+            self.assertEqual(len(file.readlines()), 11)
+
+    def test_joined_changes(self):
+        lookup = Table(load=False)
+        lookup.data = pd.DataFrame({'A': list(range(10)), 'E': ['x'] * 10})
+        lookup._run_once_process = True
+        registry._all_tables['Lookup'] = lookup
+        IncrementalTable.joins = {'Lookup': {'on': 'A', 'how': 'left'}}
+        try:
+            self.process(gen_linear_csv())
+            lookup.data.loc[3, 'E'] = 'y'
+            table = self.process(gen_linear_csv())
+        finally:
+            del IncrementalTable.joins
+            del registry._all_tables['Lookup']
+        self.assertListEqual(list(table.changed['A']), [3])
+        self.assertEqual(table.changed['E'].iloc[0], 'y')
+
+    def test_models_skipped(self):
+        IncrementalTable.output = {'Child': {'type': 'model'}}
+        set_config('models', False)
+        try:
+            self.process(gen_linear_csv())
+            table = self.process(gen_linear_csv())
+        finally:
+            set_config('models', True)
+            del IncrementalTable.output
+        self.assertEqual(len(table.changed), 10)
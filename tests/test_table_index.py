@@ -0,0 +1,133 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from kirei import Table
+
+
+def make_table(data):
+    table = Table(load=False)
+    table.data = pd.DataFrame(data)
+    return table
+
+
+class TableIndexTestCase(TestCase):
+    """Test key index caching and index based joins on `Table`s.
+    """
+    def setUp(self):
+        self.left = make_table({
+            'K': [3, 1, 2, 9, 1],
+            'L': ['a', 'b', 'c', 'd', 'e'],
+            'V': [1.0, 2.0, 3.0, 4.0, 5.0],
+        })
+        self.right = make_table({
+            'K': [1, 2, 3, 4],
+            'V': [10, 20, 30, 40],
+            'R': ['w', 'x', 'y', 'z'],
+        })
+
+    def test_index_reused(self):
+        index = self.right.index_on('K')
+        self.assertIs(self.right.index_on('K'), index)
+        self.assertIsNot(self.right.index_on(['K', 'R']), index)
+
+    def test_index_invalidated(self):
+        index = self.right.index_on('K')
+        self.right.data['K'] = [4, 3, 2, 1]
+        self.assertIsNot(self.right.index_on('K'), index)
+        self.assertListEqual(list(self.right.index_on('K')), [4, 3, 2, 1])
+        self.right.data = self.right.data.copy()
+        self.assertListEqual(list(self.right.index_on('K')), [4, 3, 2, 1])
+
+    def test_join_matches_merge(self):
+        for how in ('left', 'inner'):
+            expected = self.left.data.merge(self.right.data, on='K', how=how)
+            result = self.left._join_gather(self.right, self.right.data.columns, {'on': 'K', 'how': how})
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_join_multi_key(self):
+        self.right.data['L'] = ['b', 'c', 'a', 'q']
+        expected = self.left.data.merge(self.right.data, on=['K', 'L'], how='left')
+        result = self.left._join_gather(self.right, self.right.data.columns, {'on': ['K', 'L'], 'how': 'left'})
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_join_duplicate_keys(self):
+        self.right.data = pd.DataFrame({'K': [1, 1], 'R': ['x', 'y']})
+        self.assertIsNone(
+            self.left._join_gather(self.right, self.right.data.columns, {'on': 'K', 'how': 'left'})
+        )
+        self.left.join_table(self.right, {'on': 'K', 'how': 'left'})
+        self.assertEqual(len(self.left.data), 7)
+
+    def test_update_from(self):
+        self.right.data.loc[1, 'V'] = np.nan
+        self.left.update_from(self.right, key='K', columns='V')
+        self.assertListEqual(list(self.left.data['V']), [30.0, 10.0, 3.0, 4.0, 10.0])
+
+    def test_fillna_from(self):
+        self.left.data.loc[[0, 3], 'V'] = np.nan
+        self.left.fillna_from(self.right, key='K', columns='V')
+        self.assertListEqual(list(self.left.data['V'][:3]), [30.0, 2.0, 3.0])
+        self.assertTrue(np.isnan(self.left.data['V'][3]))
+
+    def test_from_duplicate_keys(self):
+        self.right.data = pd.DataFrame({'K': [1, 1], 'V': [10, 20]})
+        with self.assertRaises(Exception):
+            self.left.update_from(self.right, key='K', columns='V')
+        with self.assertRaises(Exception):
+            self.left.fillna_from(self.right, key='K', columns='V')
+        self.assertListEqual(list(self.left.data['V']), [1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def test_update_from_strings(self):
+        self.right.data['L'] = ['p', None, 'r', 's']
+        self.left.update_from(self.right, key='K', columns='L')
+        self.assertListEqual(list(self.left.data['L']), ['r', 'p', 'c', 'd', 'p'])
+
+    def test_from_extra_columns(self):
+        self.right.data['extra'] = [1, 2, 3, 4]
+        self.left.update_from(self.right, key='K')
+        self.left.fillna_from(self.right, key='K')
+        self.assertNotIn('extra', self.left.data)
+        self.assertListEqual(list(self.left.data['V']), [30.0, 10.0, 20.0, 4.0, 10.0])
+
+    def test_from_keeps_dtypes(self):
+        self.left.data['I'] = [1, 2, 3, 4, 5]
+        self.left.data['F'] = [True, False, True, False, True]
+        self.right.data['I'] = [10, 20, 30, 40]
+        self.right.data['F'] = [False, True, False, True]
+        self.left.update_from(self.right, key='K', columns=['I', 'F'])
+        self.assertEqual(self.left.data['I'].dtype, np.int64)
+        self.assertEqual(self.left.data['F'].dtype, bool)
+        self.assertListEqual(list(self.left.data['I']), [30, 10, 20, 4, 10])
+        self.left.update_from(self.right.data.assign(I=[1.5, 2.5, 3.5, 4.5]), key='K', columns='I')
+        self.assertListEqual(list(self.left.data['I']), [3.5, 1.5, 2.5, 4.0, 1.5])
+
+    def test_index_edited_in_place(self):
+        self.right.data = pd.DataFrame({'K': [1, 2, 3], 'L': ['b', 'c', 'a'], 'R': ['x', 'y', 'z']})
+        index = self.right.index_on(['K', 'L'])
+        self.right.data.loc[2, 'K'] = 9
+        self.assertIsNot(self.right.index_on(['K', 'L']), index)
+        self.right.data.loc[2, 'K'] = 3
+        expected = self.left.data.merge(self.right.data, on=['K', 'L'], how='left')
+        result = self.left._join_gather(self.right, self.right.data.columns, {'on': ['K', 'L'], 'how': 'left'})
+        pd.testing.assert_frame_equal(result, expected)
+        self.assertEqual(result['R'][0], 'z')
+
+    def test_join_mismatched_keys(self):
+        self.right.data['K'] = self.right.data['K'].astype(str)
+        with self.assertRaises(ValueError):
+            self.left.join_table(self.right, {'on': 'K', 'how': 'left'})
+        self.right.data['K'] = self.right.data['K'].astype(int).astype(object)
+        result = self.left._join_gather(self.right, self.right.data.columns, {'on': 'K', 'how': 'left'})
+        self.assertListEqual(list(result['R'].fillna('')), ['y', 'w', 'x', '', 'w'])
+
+    def test_from_mismatched_keys(self):
+        self.right.data['K'] = self.right.data['K'].astype(str)
+        with self.assertRaises(ValueError):
+            self.left.update_from(self.right, key='K', columns='V')
+        with self.assertRaises(ValueError):
+            self.left.fillna_from(self.right, key='K', columns='V')
+        self.assertListEqual(list(self.left.data['V']), [1.0, 2.0, 3.0, 4.0, 5.0])
+        self.right.data['K'] = self.right.data['K'].astype(int).astype(object)
+        self.left.update_from(self.right, key='K', columns='V')
+        self.assertListEqual(list(self.left.data['V']), [30.0, 10.0, 20.0, 4.0, 10.0])
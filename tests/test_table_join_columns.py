@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from kirei import Table
+
+
+class TableJoinColumnsTestCase(TestCase):
+    """Test the `join_columns` method on `Table`s.
+    """
+    def setUp(self):
+        self.table = Table(load=False)
+        self.table.data = pd.DataFrame({
+            'A': ['x', '', None, 'y', np.nan],
+            'B': [1, 0, 2, np.nan, 3.5],
+            'C': ['a', 'b', np.nan, '', 'c'],
+        })
+
+    def test_matches_rowwise(self):
+        df = self.table.data
+        expected = df.apply(
+            lambda x: ' - '.join([str(x[c]) for c in 'ABC' if x[c] and not pd.isnull(x[c])]),
+            axis=1
+        )
+        self.assertListEqual(
+            list(self.table.join_columns('A', 'B', 'C', joiner=' - ')), list(expected)
+        )
+
+    def test_skip_empty(self):
+        self.assertListEqual(
+            list(self.table.join_columns('A', 'C')), ['x, a', 'b', '', 'y', 'c']
+        )
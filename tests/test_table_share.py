@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+import pandas as pd
+from kirei import Table, registry
+from kirei.utils import copy_on_write_enabled
+
+
+class SharedTable(Table):
+    source = 'ParentTable'
+    share_source = True
+
+
+class TableShareTestCase(TestCase):
+    """Test sharing column buffers with a source table.
+    """
+    def setUp(self):
+        if not copy_on_write_enabled():
+            self.skipTest('copy-on-write is not enabled')
+        self.parent = Table(load=False)
+        self.parent.data = pd.DataFrame({
+            'A': list(range(100)),
+            'B': [float(ii) for ii in range(100)],
+        })
+        registry._all_tables['ParentTable'] = self.parent
+
+    def tearDown(self):
+        registry._all_tables.pop('ParentTable', None)
+
+    def test_shared_until_written(self):
+        table = SharedTable()
+        sharing = table.memory_sharing()
+        self.assertEqual(sharing.loc['A', 'shared'], sharing.loc['A', 'bytes'])
+        table.data.loc[0, 'A'] = -1
+        self.assertEqual(self.parent.data.loc[0, 'A'], 0)
+        sharing = table.memory_sharing()
+        self.assertEqual(sharing.loc['A', 'shared'], 0)
+        self.assertEqual(sharing.loc['B', 'shared'], sharing.loc['B', 'bytes'])
@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from kirei.tagger import Tagger
+
+
+class NoteTagger(Tagger):
+    tag_exprs = {
+        'pain': 'pain',
+        'back': ['back pain', 'lumbar'],
+        'spine': 'back',
+        'dose': r'\d+ ?mg',
+    }
+
+
+class TaggerTestCase(TestCase):
+    """Test batch tagging of Series.
+    """
+    def setUp(self):
+        self.tagger = NoteTagger()
+        self.texts = pd.Series([
+            'Back pain today', 'no issues', np.nan, 'lumbar 5mg', 'painful', 'no issues'
+        ])
+
+    def test_matches_tag_text(self):
+        result = self.tagger.tag_series(self.texts)
+        for text, tags in zip(self.texts, result):
+            expected = self.tagger.tag_text(text) if isinstance(text, str) else set()
+            self.assertEqual(tags, frozenset(expected))
+
+    def test_memoized(self):
+        self.tagger.tag_series(self.texts)
+        self.tagger.tag_series(self.texts)
+        info = self.tagger._tag_cached.cache_info()
+        self.assertEqual(info.misses, 4)
+        self.assertEqual(info.hits, 4)